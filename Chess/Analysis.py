@@ -0,0 +1,198 @@
+"""
+Batch analysis of many positions on all cores.
+Positions (FEN strings, or every position of PgnGame objects) are sent to a process pool in
+chunks. Each worker process keeps one Searcher, and with it one transposition table, for
+its whole life, so consecutive positions from the same game start warm. Only a bounded
+number of chunks is in flight at a time, so an endless input (a whole database) never
+piles up in memory, and results stream back in input order or as they complete.
+
+Usage:
+    python -m Chess.Analysis --fen-file positions.txt --depth 5
+    python -m Chess.Analysis --pgn games.pgn --movetime 200 --workers 8 --unordered
+"""
+
+import argparse
+import itertools
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+# Allow running as a script as well as with -m
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Chess.ChessEngine import GameState, moveCodeToUci
+from Chess.ChessAI import Searcher, CHECKMATE, MAX_DEPTH
+from Chess.Uci import formatScore
+from Chess.Pgn import PgnGame, readGames
+
+DEFAULT_DEPTH = 4 # Used when no depth, time or node limit is given
+DEFAULT_CHUNK_SIZE = 8 # Positions per task: fewer, larger messages between processes
+
+_searcher = None # The worker process's own Searcher (see _initWorker)
+
+
+class AnalysisResult:
+    """
+    Search result for one input position. index is its position in the input stream;
+    bestMove and pv are in UCI notation, score in centipawns for the side to move.
+    error holds the message when the position could not be analysed (e.g. a bad FEN).
+    """
+    __slots__ = ('index', 'fen', 'bestMove', 'score', 'depth', 'pv', 'nodes', 'elapsed', 'error')
+
+    def __init__(self, index, fen, bestMove=None, score=0, depth=0, pv="", nodes=0, elapsed=0.0, error=None):
+        self.index = index
+        self.fen = fen
+        self.bestMove = bestMove
+        self.score = score
+        self.depth = depth
+        self.pv = pv
+        self.nodes = nodes
+        self.elapsed = elapsed
+        self.error = error
+
+
+def analysePositions(positions, workers=None, depth=None, timeLimit=None, nodeLimit=None,
+                     chunkSize=DEFAULT_CHUNK_SIZE, ordered=True, maxPendingChunks=None, ttSizeBits=16):
+    """
+    Analyses every position from positions (FEN strings and/or PgnGame objects, which
+    contribute their start position and the position after every move) and yields an
+    AnalysisResult per position. With ordered=True results come back in input order, otherwise as soon as they are done.
+    At most maxPendingChunks chunks (default: two per worker) are queued at once; the input
+    is only read further as results are consumed.
+    timeLimit is in seconds per position.
+    """
+    workers = workers or os.cpu_count() or 1
+    maxPendingChunks = maxPendingChunks or 2 * workers
+    if depth is None and timeLimit is None and nodeLimit is None:
+        depth = DEFAULT_DEPTH
+    limits = (depth, timeLimit, nodeLimit)
+    chunks = _chunked(enumerate(_expandPositions(positions)), chunkSize)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_initWorker, initargs=(ttSizeBits,)) as executor:
+        pending = deque()
+        for chunk in itertools.islice(chunks, maxPendingChunks):
+            pending.append(executor.submit(_analyseChunk, chunk, limits))
+        while pending:
+            if ordered:
+                done = [pending.popleft()]
+            else:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                done = [future for future in pending if future in finished]
+                for future in done:
+                    pending.remove(future)
+            for future in done:
+                # Refill before handing results out, so the workers stay busy meanwhile
+                for chunk in itertools.islice(chunks, 1):
+                    pending.append(executor.submit(_analyseChunk, chunk, limits))
+                yield from future.result()
+
+
+def _expandPositions(positions):
+    """
+    Yields (fen, error) for every position to analyse; error is None except for a game whose
+    FEN tag or moves can't be read, which ends with an entry carrying the message (and the
+    last position reached) so the run carries on with the next game.
+    """
+    for item in positions:
+        if not isinstance(item, PgnGame):
+            yield item, None
+            continue
+        fen = item.headers.get("FEN", "")
+        try:
+            gs = item.startingPosition()
+            fen = gs.to_fen()
+            yield fen, None
+            for gs in item.replay(gs):
+                fen = gs.to_fen()
+                yield fen, None
+        except ValueError as e:
+            yield fen, str(e)
+
+
+def _chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _initWorker(ttSizeBits):
+    global _searcher
+    _searcher = Searcher(ttSizeBits)
+
+
+def _analyseChunk(chunk, limits):
+    """
+    Runs in a worker process: analyses [(index, (fen, error))] with the process's warm Searcher.
+    """
+    depth, timeLimit, nodeLimit = limits
+    results = []
+    for index, (fen, error) in chunk:
+        if error is not None:
+            results.append(AnalysisResult(index, fen, error=error))
+            continue
+        try:
+            gs = GameState.from_fen(fen)
+        except ValueError as e:
+            results.append(AnalysisResult(index, fen, error=str(e)))
+            continue
+        result = _searcher.search(gs, maxDepth=depth or MAX_DEPTH, timeLimit=timeLimit, nodeLimit=nodeLimit)
+        if result is None:
+            # No legal moves: mated or stalemated
+            results.append(AnalysisResult(index, fen, score=-CHECKMATE if gs.inCheck() else 0))
+        else:
+            results.append(AnalysisResult(index, fen, moveCodeToUci(result.bestMove), result.score, result.depth,
+                                          result.getPvNotation(), result.nodes, result.elapsed))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyse many positions in parallel.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--fen-file", help="text file with one FEN per line")
+    source.add_argument("--pgn", help="PGN file: every position of every game is analysed")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per core)")
+    parser.add_argument("--depth", type=int, help=f"search depth per position (default {DEFAULT_DEPTH} without other limits)")
+    parser.add_argument("--movetime", type=int, help="milliseconds per position")
+    parser.add_argument("--nodes", type=int, help="node limit per position")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="positions per task sent to a worker")
+    parser.add_argument("--unordered", action="store_true", help="print results as they finish, not in input order")
+    args = parser.parse_args(argv)
+
+    if args.pgn:
+        positions = readGames(args.pgn)
+    else:
+        positions = _fenLines(args.fen_file)
+    timeLimit = args.movetime / 1000 if args.movetime is not None else None
+
+    count = errors = 0
+    start = time.perf_counter()
+    for result in analysePositions(positions, workers=args.workers, depth=args.depth, timeLimit=timeLimit,
+                                   nodeLimit=args.nodes, chunkSize=args.chunk_size, ordered=not args.unordered):
+        count += 1
+        if result.error is not None:
+            errors += 1
+            print(f"{result.index}\t{result.fen}\terror: {result.error}")
+        else:
+            print(f"{result.index}\t{result.fen}\t{result.bestMove or '(none)'}\t{formatScore(result.score)}\t"
+                  f"depth {result.depth}\tnodes {result.nodes}\tpv {result.pv}")
+    elapsed = time.perf_counter() - start
+    print(f"Positions: {count}  Errors: {errors}  Time: {elapsed:.3f}s  "
+          f"Positions/sec: {count / elapsed if elapsed > 0 else 0:.1f}", file=sys.stderr)
+    return 1 if errors else 0
+
+
+def _fenLines(path):
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                yield line
+
+
+if __name__ == "__main__":
+    sys.exit(main())
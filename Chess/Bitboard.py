@@ -0,0 +1,118 @@
+"""
+Bitboard helpers and precomputed attack tables.
+Squares are numbered 0-63 as row * 8 + col, so square 0 is a8 and square 63 is h1
+(the same orientation as GameState.board).
+"""
+
+PIECES = ('wP', 'wN', 'wB', 'wR', 'wQ', 'wK', 'bP', 'bN', 'bB', 'bR', 'bQ', 'bK')
+
+SQUARE_BB = [1 << sq for sq in range(64)]
+FULL_BOARD = (1 << 64) - 1
+
+KNIGHT_OFFSETS = ((-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1))
+KING_OFFSETS = ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1))
+ROOK_DIRECTIONS = ((-1, 0), (0, -1), (1, 0), (0, 1))
+BISHOP_DIRECTIONS = ((-1, -1), (-1, 1), (1, -1), (1, 1))
+
+
+def _stepTable(offsets):
+    """
+    Builds a 64-entry table of the squares reachable with a single step from each offset.
+    """
+    table = []
+    for sq in range(64):
+        r, c = divmod(sq, 8)
+        bb = 0
+        for dr, dc in offsets:
+            endRow, endCol = r + dr, c + dc
+            if 0 <= endRow < 8 and 0 <= endCol < 8:
+                bb |= 1 << (endRow * 8 + endCol)
+        table.append(bb)
+    return table
+
+
+def _rayTable(direction):
+    """
+    Builds a 64-entry table of the full ray (excluding the origin) in one direction.
+    """
+    dr, dc = direction
+    table = []
+    for sq in range(64):
+        r, c = divmod(sq, 8)
+        bb = 0
+        for i in range(1, 8):
+            endRow, endCol = r + dr * i, c + dc * i
+            if not (0 <= endRow < 8 and 0 <= endCol < 8):
+                break
+            bb |= 1 << (endRow * 8 + endCol)
+        table.append(bb)
+    return table
+
+
+KNIGHT_ATTACKS = _stepTable(KNIGHT_OFFSETS)
+KING_ATTACKS = _stepTable(KING_OFFSETS)
+# White pawns capture towards row 0, Black pawns towards row 7
+PAWN_ATTACKS = {
+    'w': _stepTable(((-1, -1), (-1, 1))),
+    'b': _stepTable(((1, -1), (1, 1))),
+}
+
+RAYS = {d: _rayTable(d) for d in ROOK_DIRECTIONS + BISHOP_DIRECTIONS}
+
+
+def _lineTables():
+    """
+    Builds BETWEEN[a][b] (squares strictly between a and b) and LINE[a][b] (the whole
+    line through both, edge to edge). Entries are 0 when the squares are not aligned.
+    """
+    between = [[0] * 64 for _ in range(64)]
+    line = [[0] * 64 for _ in range(64)]
+    for d, table in RAYS.items():
+        opposite = RAYS[(-d[0], -d[1])]
+        for a in range(64):
+            fullLine = table[a] | opposite[a] | (1 << a)
+            ray = table[a]
+            while ray:
+                low = ray & -ray
+                b = low.bit_length() - 1
+                ray ^= low
+                between[a][b] = table[a] ^ table[b] ^ low
+                line[a][b] = fullLine
+    return between, line
+
+
+BETWEEN, LINE = _lineTables()
+
+# A ray is "positive" when the square index grows along it, so the nearest blocker is the
+# lowest set bit. For the other directions the nearest blocker is the highest set bit.
+_ROOK_RAYS = tuple((RAYS[d], d[0] > 0 or (d[0] == 0 and d[1] > 0)) for d in ROOK_DIRECTIONS)
+_BISHOP_RAYS = tuple((RAYS[d], d[0] > 0) for d in BISHOP_DIRECTIONS)
+
+
+def _slidingAttacks(sq, occupied, rays):
+    attacks = 0
+    for table, positive in rays:
+        ray = table[sq]
+        blockers = ray & occupied
+        if blockers:
+            if positive:
+                blocker = (blockers & -blockers).bit_length() - 1
+            else:
+                blocker = blockers.bit_length() - 1
+            ray ^= table[blocker]
+        attacks |= ray
+    return attacks
+
+
+def rookAttacks(sq, occupied):
+    """
+    Returns the squares a rook on sq attacks given the occupancy bitboard (first blocker included).
+    """
+    return _slidingAttacks(sq, occupied, _ROOK_RAYS)
+
+
+def bishopAttacks(sq, occupied):
+    """
+    Returns the squares a bishop on sq attacks given the occupancy bitboard (first blocker included).
+    """
+    return _slidingAttacks(sq, occupied, _BISHOP_RAYS)
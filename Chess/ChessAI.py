@@ -0,0 +1,372 @@
+"""
+Alpha-beta search on top of GameState.
+Negamax with iterative deepening and a fixed-size transposition table keyed by
+GameState.zobristKey, stopped by a depth, time or node budget. Leaves are resolved by a
+capture-only quiescence search pruned with static exchange evaluation.
+Repetitions and the fifty-move rule score as draws.
+"""
+
+import threading
+import time
+
+from Chess.Bitboard import SQUARE_BB
+from Chess.ChessEngine import CAPTURE_FLAG, PROMOTION, EN_PASSANT, FIFTY_MOVE_PLIES, moveCodeToUci
+from Chess.MoveOrdering import MoveOrdering
+
+CHECKMATE = 100000
+MATE_THRESHOLD = CHECKMATE - 1000 # Scores beyond this are "mate in N"
+INFINITY = CHECKMATE + 1
+MAX_DEPTH = 64
+
+# Centipawn piece values for static exchange evaluation
+SEE_VALUES = {"P": 100, "N": 320, "B": 330, "R": 500, "Q": 900, "K": 20000}
+_SEE_ORDER = ('P', 'N', 'B', 'R', 'Q', 'K') # Least valuable attacker first
+
+# Transposition table bound types
+EXACT = 0
+LOWER_BOUND = 1 # Score is at least this (fail high)
+UPPER_BOUND = 2 # Score is at most this (fail low)
+
+
+class TranspositionTable:
+    """
+    Fixed-size hash table of search results indexed by the low bits of the Zobrist key.
+    Memory stays bounded: a slot is overwritten by a deeper search or by any result
+    from a newer search.
+    """
+    def __init__(self, sizeBits=18):
+        self.size = 1 << sizeBits
+        self.mask = self.size - 1
+        self.entries = [None] * self.size
+        self.age = 0
+
+    def newSearch(self):
+        self.age += 1
+
+    def clear(self):
+        self.entries = [None] * self.size
+        self.age = 0
+
+    def probe(self, key):
+        """
+        Returns (depth, bound, score, move) for key, or None.
+        """
+        entry = self.entries[key & self.mask]
+        if entry is not None and entry[0] == key:
+            return entry[1:5]
+        return None
+
+    def store(self, key, depth, bound, score, move):
+        index = key & self.mask
+        entry = self.entries[index]
+        if entry is None or entry[0] == key or entry[5] != self.age or depth >= entry[1]:
+            if move == 0 and entry is not None and entry[0] == key:
+                move = entry[4] # Keep the known best move when a fail-low result has none
+            self.entries[index] = (key, depth, bound, score, move, self.age)
+
+
+class SearchResult:
+    """
+    Outcome of a search: best move and principal variation as packed move ints
+    (see ChessEngine.encodeMove), score in centipawns from the side to move's view.
+    firstMoveCutoffRate is the share of beta cutoffs made by the first move searched.
+    """
+    def __init__(self, bestMove, score, depth, pv, nodes, elapsed, firstMoveCutoffRate=0.0):
+        self.bestMove = bestMove
+        self.score = score
+        self.depth = depth
+        self.pv = pv
+        self.nodes = nodes
+        self.elapsed = elapsed
+        self.firstMoveCutoffRate = firstMoveCutoffRate
+
+    def isMate(self):
+        return abs(self.score) >= MATE_THRESHOLD
+
+    def getPvNotation(self):
+        return " ".join(moveCodeToUci(code) for code in self.pv)
+
+
+class Searcher:
+    """
+    Keeps the transposition table and the move ordering tables between searches so later
+    moves of the same game start warm. stopEvent (e.g. a multiprocessing.Event) lets another
+    process stop the search, like stop() does within this one. It belongs to the caller:
+    searches never clear it, so clear it before starting one and a stop sent before the
+    search gets going still counts. tt replaces the private table, e.g. with a
+    SharedTable.SharedTranspositionTable used by several processes.
+    """
+    def __init__(self, ttSizeBits=18, stopEvent=None, tt=None):
+        self.tt = tt if tt is not None else TranspositionTable(ttSizeBits)
+        self.ordering = MoveOrdering()
+        self.nodes = 0
+        self.stopRequested = False # Set once stopEvent or the time or node budget ends the search
+        self.stopEvent = stopEvent if stopEvent is not None else threading.Event()
+        self._deadline = None
+        self._nodeLimit = None
+        self._pvTable = [[] for _ in range(MAX_DEPTH + 1)]
+
+    def clear(self):
+        """
+        Forgets the transposition table and the move ordering tables (call between games).
+        """
+        self.tt.clear()
+        self.ordering.clear()
+
+    def stop(self):
+        """
+        Asks a running search to return as soon as possible (safe to call from another thread).
+        Later searches stop too, until stopEvent is cleared.
+        """
+        self.stopEvent.set()
+
+    def search(self, gs, maxDepth=MAX_DEPTH, timeLimit=None, nodeLimit=None, onIteration=None):
+        """
+        Searches gs with iterative deepening until maxDepth, timeLimit (seconds) or nodeLimit is reached.
+        onIteration(result) is called after every completed depth. Returns the last SearchResult,
+        or None if the side to move has no legal moves. gs is left as it was.
+        """
+        start = time.perf_counter()
+        self.nodes = 0
+        self.stopRequested = self.stopEvent.is_set()
+        self._deadline = start + timeLimit if timeLimit is not None else None
+        self._nodeLimit = nodeLimit
+        self.tt.newSearch()
+        self.ordering.newSearch()
+
+        rootMoves = gs.generateLegalMoves()
+        if not rootMoves:
+            return None
+        result = SearchResult(rootMoves[0], 0, 0, [rootMoves[0]], 0, 0.0)
+        for depth in range(1, maxDepth + 1):
+            score = self._negamax(gs, depth, -INFINITY, INFINITY, 0)
+            if self.stopRequested and depth > 1:
+                break # Unfinished iteration: keep the previous result
+            pv = self._pvTable[0][:] or [rootMoves[0]]
+            result = SearchResult(pv[0], score, depth, pv, self.nodes, time.perf_counter() - start,
+                                  self.ordering.firstMoveCutoffRate())
+            if onIteration is not None:
+                onIteration(result)
+            if self.stopRequested or abs(score) >= MATE_THRESHOLD:
+                break
+        result.nodes = self.nodes
+        result.elapsed = time.perf_counter() - start
+        return result
+
+    def searchMoves(self, gs, moves, depth, timeLimit=None, nodeLimit=None, newSearch=False):
+        """
+        Searches only the given root moves of gs, in order, to a fixed depth (used to split
+        the root between processes). Returns ([(move, score)] for the moves finished, best
+        move's pv). Scores after the first are upper bounds unless they improved on the best.
+        """
+        self.nodes = 0
+        self.stopRequested = self.stopEvent.is_set()
+        self._deadline = time.perf_counter() + timeLimit if timeLimit is not None else None
+        self._nodeLimit = nodeLimit
+        if newSearch:
+            self.tt.newSearch()
+            self.ordering.newSearch()
+        alpha = -INFINITY
+        scores = []
+        pv = []
+        for code in moves:
+            gs.makeMoveCode(code)
+            score = -self._negamax(gs, depth - 1, -INFINITY, -alpha, 1)
+            gs.undoMove()
+            if self.stopRequested:
+                break
+            scores.append((code, score))
+            if score > alpha:
+                alpha = score
+                pv = [code] + self._pvTable[1]
+        return scores, pv
+
+    def _checkBudget(self):
+        if self.stopEvent.is_set():
+            self.stopRequested = True
+        if self._deadline is not None and time.perf_counter() >= self._deadline:
+            self.stopRequested = True
+        if self._nodeLimit is not None and self.nodes >= self._nodeLimit:
+            self.stopRequested = True
+
+    def _negamax(self, gs, depth, alpha, beta, ply):
+        self.nodes += 1
+        if self.nodes & 255 == 0:
+            self._checkBudget()
+        self._pvTable[ply] = []
+        # Any repetition along the game + search path is scored as a draw: repeating once
+        # means the side to move could repeat again, so it can't be worth more than that
+        if ply > 0 and gs.isRepetition():
+            return 0
+        # Fifty-move rule: a draw, except that checkmate on the 100th ply still wins
+        if ply > 0 and gs.halfmoveClock >= FIFTY_MOVE_PLIES:
+            return -CHECKMATE + ply if gs.inCheck() and not gs.hasAnyLegalMove() else 0
+
+        key = gs.zobristKey
+        ttMove = 0
+        entry = self.tt.probe(key)
+        if entry is not None:
+            entryDepth, bound, score, ttMove = entry
+            if ply > 0 and entryDepth >= depth:
+                score = _scoreFromTT(score, ply)
+                if bound == EXACT or (bound == LOWER_BOUND and score >= beta) or (bound == UPPER_BOUND and score <= alpha):
+                    return score
+
+        if depth <= 0 or ply >= MAX_DEPTH:
+            return self._quiescence(gs, alpha, beta, ply)
+
+        # Hash move, captures, killers, then quiets by history: generated only as far as the loop gets
+        originalAlpha = alpha
+        bestScore = -INFINITY
+        bestMove = 0
+        moveCount = 0
+        quietsTried = []
+        for code in self.ordering.orderedMoves(gs, ply, ttMove):
+            moveCount += 1
+            gs.makeMoveCode(code)
+            score = -self._negamax(gs, depth - 1, -beta, -alpha, ply + 1)
+            gs.undoMove()
+            if self.stopRequested:
+                return 0
+            if score > bestScore:
+                bestScore = score
+                bestMove = code
+                if score > alpha:
+                    alpha = score
+                    self._pvTable[ply] = [code] + self._pvTable[ply + 1]
+                    if alpha >= beta:
+                        self.ordering.recordCutoff(code, depth, ply, gs.whiteToMove, moveCount, quietsTried)
+                        break
+            if not (code & CAPTURE_FLAG or code >> 12 & PROMOTION):
+                quietsTried.append(code)
+        if moveCount == 0:
+            return -CHECKMATE + ply if gs.inCheck() else 0
+
+        if bestScore <= originalAlpha:
+            bound = UPPER_BOUND
+        elif bestScore >= beta:
+            bound = LOWER_BOUND
+        else:
+            bound = EXACT
+        self.tt.store(key, depth, bound, _scoreToTT(bestScore, ply), bestMove if bound != UPPER_BOUND else 0)
+        return bestScore
+
+    def _quiescence(self, gs, alpha, beta, ply):
+        """
+        Searches captures (and promotions) only, until the position is quiet, so the static
+        evaluation is never taken in the middle of an exchange. The side to move may "stand pat"
+        on the static score. Captures that lose material by static exchange evaluation are skipped.
+        """
+        self.nodes += 1
+        if self.nodes & 255 == 0:
+            self._checkBudget()
+        if ply >= MAX_DEPTH:
+            return self.evaluate(gs)
+
+        inCheck = gs.inCheck()
+        if inCheck:
+            # No standing pat in check: every evasion has to be looked at
+            moves = gs.iterLegalMoves()
+            bestScore = -INFINITY
+        else:
+            bestScore = self.evaluate(gs)
+            if bestScore >= beta:
+                return bestScore
+            if bestScore > alpha:
+                alpha = bestScore
+            moves = gs.iterLegalMoves(order=("captures",))
+
+        for code in moves:
+            if not inCheck and code & CAPTURE_FLAG and staticExchangeEvaluation(gs, code) < 0:
+                continue # Loses material even with best play: not worth searching
+            gs.makeMoveCode(code)
+            score = -self._quiescence(gs, -beta, -alpha, ply + 1)
+            gs.undoMove()
+            if self.stopRequested:
+                return 0
+            if score > bestScore:
+                bestScore = score
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+        if bestScore == -INFINITY and inCheck:
+            return -CHECKMATE + ply # No evasion
+        return bestScore
+
+    def evaluate(self, gs):
+        """
+        Static evaluation in centipawns from the side to move's point of view.
+        """
+        score = gs.scoreBoard()
+        return score if gs.whiteToMove else -score
+
+
+def staticExchangeEvaluation(gs, code):
+    """
+    Material balance (centipawns) for the side to move after the full sequence of captures
+    on the target square of a capture, each side recapturing with its least valuable
+    attacker and free to stop when continuing would lose. Works on gs.board and the
+    same attack tables as squareUnderAttack, with sliders seen through pieces that have
+    already captured (x-rays).
+    """
+    board = gs.board
+    pieces = gs.pieceBitboards
+    startSq, endSq = code & 63, code >> 6 & 63
+    attacker = board[startSq >> 3][startSq & 7]
+    occupied = (gs.colorBitboards['w'] | gs.colorBitboards['b']) ^ SQUARE_BB[startSq]
+    if code >> 12 == EN_PASSANT:
+        gains = [SEE_VALUES['P']]
+        occupied ^= SQUARE_BB[(startSq & ~7) | (endSq & 7)]
+    else:
+        gains = [SEE_VALUES[board[endSq >> 3][endSq & 7][1]]]
+    side = 'b' if attacker[0] == 'w' else 'w'
+    pieceOnSquare = SEE_VALUES[attacker[1]]
+
+    while True:
+        attackers = gs.attackersTo(endSq, occupied, side) & occupied
+        if not attackers:
+            break
+        for piece in _SEE_ORDER:
+            bb = attackers & pieces[side + piece]
+            if bb:
+                break
+        # Speculative: capturing the piece on the square and then being recaptured
+        gains.append(pieceOnSquare - gains[-1])
+        if max(-gains[-2], gains[-1]) < 0:
+            gains.pop() # Neither side would go on with this exchange: the result is already decided
+            break
+        occupied ^= bb & -bb
+        pieceOnSquare = SEE_VALUES[piece]
+        side = 'b' if side == 'w' else 'w'
+
+    # Each side chooses between stopping and continuing, from the last capture backwards
+    for i in range(len(gains) - 1, 0, -1):
+        gains[i - 1] = -max(-gains[i - 1], gains[i])
+    return gains[0]
+
+
+def _scoreToTT(score, ply):
+    """
+    Mate scores are stored relative to the node, not the root, so they stay valid at any ply.
+    """
+    if score >= MATE_THRESHOLD:
+        return score + ply
+    if score <= -MATE_THRESHOLD:
+        return score - ply
+    return score
+
+
+def _scoreFromTT(score, ply):
+    if score >= MATE_THRESHOLD:
+        return score - ply
+    if score <= -MATE_THRESHOLD:
+        return score + ply
+    return score
+
+
+def findBestMove(gs, timeLimit=1.0, maxDepth=MAX_DEPTH):
+    """
+    Convenience wrapper: searches gs with a fresh Searcher and returns the SearchResult.
+    """
+    return Searcher().search(gs, maxDepth=maxDepth, timeLimit=timeLimit)
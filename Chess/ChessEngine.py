@@ -4,6 +4,60 @@ Will display valid moves.
 Will keep a move log.
 """
 
+from collections import OrderedDict
+
+from Chess.Bitboard import (PIECES, SQUARE_BB, FULL_BOARD, BETWEEN, LINE, KNIGHT_ATTACKS, KING_ATTACKS,
+                            PAWN_ATTACKS, rookAttacks, bishopAttacks)
+from Chess.Evaluation import MG_TABLE, EG_TABLE, PIECE_PHASE, taperedScore
+from Chess.Zobrist import PIECE_KEYS, BLACK_TO_MOVE_KEY, CASTLING_KEYS, EN_PASSANT_KEYS, castlingIndex
+
+# Packed move encoding used by the move generator (16 bits):
+# bits 0-5 start square, bits 6-11 end square, bits 12-15 flags. Squares are row * 8 + col.
+QUIET_MOVE = 0
+DOUBLE_PAWN_PUSH = 1
+KING_CASTLE = 2
+QUEEN_CASTLE = 3
+CAPTURE = 4
+EN_PASSANT = 5
+PROMOTION = 8 # Combined with CAPTURE for capture-promotions; the low two bits pick the piece
+PROMOTION_CODES = {'N': PROMOTION, 'B': PROMOTION | 1, 'R': PROMOTION | 2, 'Q': PROMOTION | 3}
+PROMOTION_PIECES = ('N', 'B', 'R', 'Q')
+CAPTURE_FLAG = CAPTURE << 12
+
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+FIFTY_MOVE_PLIES = 100 # Fifty moves by each side without a capture or pawn move
+
+# Stages of iterLegalMoves: the hash move, captures and promotions (most valuable victim first), quiet moves
+MOVE_STAGES = ("hash", "captures", "quiets")
+_PIECE_RANK = {'P': 0, 'N': 1, 'B': 2, 'R': 3, 'Q': 4, 'K': 5} # For capture ordering
+# Attack bitboard of a Knight, Bishop, Rook or Queen on sq, by piece type
+_PIECE_ATTACKS = {
+    'N': lambda sq, occupied: KNIGHT_ATTACKS[sq],
+    'B': bishopAttacks,
+    'R': rookAttacks,
+    'Q': lambda sq, occupied: rookAttacks(sq, occupied) | bishopAttacks(sq, occupied),
+}
+
+
+def encodeMove(startSq, endSq, flags=QUIET_MOVE):
+    """
+    Packs a move into an int: startSq | endSq << 6 | flags << 12.
+    """
+    return startSq | endSq << 6 | flags << 12
+
+
+def moveCodeToUci(code):
+    """
+    Long algebraic (UCI) notation for a packed move, e.g. e2e4 or e7e8q.
+    """
+    startSq, endSq, flags = code & 63, code >> 6 & 63, code >> 12
+    uci = Move.colsToFiles[startSq & 7] + Move.rowsToRanks[startSq >> 3] + \
+          Move.colsToFiles[endSq & 7] + Move.rowsToRanks[endSq >> 3]
+    if flags & PROMOTION:
+        uci += PROMOTION_PIECES[flags & 3].lower()
+    return uci
+
+
 class GameState:
     """
     Manages the current state of a chess game, handles move logic, and validates rules.
@@ -13,7 +67,7 @@ class GameState:
         # 1st char: Color ('w' or 'b')
         # 2nd char: Piece type ('P', 'R', 'N', 'B', 'Q', 'K')
         # "--": Empty square
-        self.board = [
+        board = [
             ["bR", "bN", "bB", "bQ", "bK", "bB", "bN", "bR"],
             ["bP", "bP", "bP", "bP", "bP", "bP", "bP", "bP"],
             ["--", "--", "--", "--", "--", "--", "--", "--"],
@@ -23,27 +77,239 @@ class GameState:
             ["wP", "wP", "wP", "wP", "wP", "wP", "wP", "wP"],
             ["wR", "wN", "wB", "wQ", "wK", "wB", "wN", "wR"]
         ]
-        self.whiteToMove = True
+        self._setUp(board, True, CastleRights(True, True, True, True), (), 0, 1)
+
+    def _setUp(self, board, whiteToMove, castleRights, enPassantPossible, halfmoveClock, fullmoveNumber):
+        """
+        Sets up every attribute for a game that starts at the given position, with the logs
+        holding only that position. Shared by __init__ and from_fen.
+        """
+        self.board = board
+        self.whiteToMove = whiteToMove
         self.moveLog = []
-        self.whiteKingLocation = (7, 4)
-        self.blackKingLocation = (0, 4)
+        self.whiteKingLocation = self.blackKingLocation = None
+        for r, row in enumerate(board):
+            for c, piece in enumerate(row):
+                if piece == 'wK':
+                    self.whiteKingLocation = (r, c)
+                elif piece == 'bK':
+                    self.blackKingLocation = (r, c)
         self.checkMate = False
         self.staleMate = False
-        self.enPassantPossible = ()  # Coordinates of the square where an en passant capture is possible
+        self.repetitionDraw = False # Threefold repetition
+        self.fiftyMoveDraw = False
+        self.enPassantPossible = enPassantPossible  # Coordinates of the square where an en passant capture is possible
         
-        self.currentCastlingRight = CastleRights(True, True, True, True)
+        self.currentCastlingRight = castleRights
         self.castleRightsLog = [CastleRights(self.currentCastlingRight.wks, self.currentCastlingRight.bks, 
                                              self.currentCastlingRight.wqs, self.currentCastlingRight.bqs)]
         self.enPassantPossibleLog = [self.enPassantPossible]
+        # Move clocks as in FEN: plies since the last capture or pawn move, and the move number
+        # (starts at 1, goes up after each Black move). halfmoveClockLog[-1] is the current clock.
+        self.halfmoveClock = halfmoveClock
+        self.fullmoveNumber = fullmoveNumber
+        self.halfmoveClockLog = [self.halfmoveClock]
+        # Optional MoveCache for generateLegalMoves (see enableMoveCache); off by default
+        self.moveCache = None
+
+        # Bitboard mirror of self.board: one 64-bit int per piece plus per-color occupancy.
+        # Bit (row * 8 + col) is set when that square holds the piece.
+        self.pieceBitboards = {}
+        self.colorBitboards = {}
+        # 64-bit Zobrist hash of the position (pieces, side to move, castling rights, en passant),
+        # kept up to date by makeMove/undoMove. zobristKeyLog[-1] is always the current key.
+        self.zobristKey = 0
+        # Incremental evaluation (see Evaluation.py): White-positive middlegame and endgame
+        # material + piece-square sums, and the game phase from the remaining pieces
+        self.mgScore = 0
+        self.egScore = 0
+        self.gamePhase = 0
+        self.refreshFromBoard()
+        self.zobristKeyLog = [self.zobristKey]
+
+    @classmethod
+    def from_fen(cls, fen):
+        """
+        Builds a GameState from a FEN string in one pass: board, side to move, castling rights,
+        en passant square, king locations and move clocks. The logs start at this position, so
+        undoMove works back to it. Castling rights whose king or rook has left its starting
+        square are dropped. Raises ValueError for malformed FEN.
+        """
+        fields = fen.split()
+        if not fields:
+            raise ValueError("Empty FEN")
+        board = []
+        kings = []
+        for rankString in fields[0].split('/'):
+            row = []
+            for ch in rankString:
+                if ch.isdigit():
+                    row.extend(["--"] * int(ch))
+                elif ch.upper() in "PNBRQK":
+                    piece = ('w' if ch.isupper() else 'b') + ch.upper()
+                    if ch.upper() == 'K':
+                        kings.append(piece)
+                    row.append(piece)
+                else:
+                    raise ValueError(f"Invalid FEN piece '{ch}' in {fen!r}")
+            board.append(row)
+        if len(board) != 8 or any(len(row) != 8 for row in board):
+            raise ValueError(f"Invalid FEN placement in {fen!r}")
+        if 'wK' not in kings or 'bK' not in kings:
+            raise ValueError(f"FEN is missing a king: {fen!r}")
+
+        side = fields[1] if len(fields) > 1 else 'w'
+        castling = fields[2] if len(fields) > 2 else '-'
+        enPassant = fields[3] if len(fields) > 3 else '-'
+        if side not in ('w', 'b'):
+            raise ValueError(f"Invalid FEN side to move '{side}' in {fen!r}")
+        if castling != '-' and (not castling or any(ch not in "KQkq" for ch in castling)):
+            raise ValueError(f"Invalid FEN castling rights '{castling}' in {fen!r}")
+        if enPassant != '-' and (len(enPassant) != 2 or enPassant[0] not in Move.filesToCols
+                                 or enPassant[1] not in Move.ranksToRows):
+            raise ValueError(f"Invalid FEN en passant square '{enPassant}' in {fen!r}")
+        try:
+            halfmoveClock = int(fields[4]) if len(fields) > 4 else 0
+            fullmoveNumber = int(fields[5]) if len(fields) > 5 else 1
+        except ValueError:
+            raise ValueError(f"Invalid FEN move clocks in {fen!r}") from None
+
+        # makeMove expects the castling rook on its corner, so a right only stands while
+        # the king and that rook are both still on their starting squares
+        whiteKingHome, blackKingHome = board[7][4] == 'wK', board[0][4] == 'bK'
+        castleRights = CastleRights('K' in castling and whiteKingHome and board[7][7] == 'wR',
+                                    'k' in castling and blackKingHome and board[0][7] == 'bR',
+                                    'Q' in castling and whiteKingHome and board[7][0] == 'wR',
+                                    'q' in castling and blackKingHome and board[0][0] == 'bR')
+        enPassantPossible = (Move.ranksToRows[enPassant[1]], Move.filesToCols[enPassant[0]]) if enPassant != '-' else ()
+        gs = cls.__new__(cls) # Skip __init__: nothing from the starting position is reused
+        gs._setUp(board, side == 'w', castleRights, enPassantPossible, halfmoveClock, max(1, fullmoveNumber))
+        return gs
+
+    def to_fen(self):
+        """
+        Returns the position as a FEN string (the inverse of from_fen).
+        """
+        ranks = []
+        for row in self.board:
+            rankString = ""
+            empty = 0
+            for piece in row:
+                if piece == "--":
+                    empty += 1
+                    continue
+                if empty:
+                    rankString += str(empty)
+                    empty = 0
+                rankString += piece[1] if piece[0] == 'w' else piece[1].lower()
+            if empty:
+                rankString += str(empty)
+            ranks.append(rankString)
+        rights = self.currentCastlingRight
+        castling = ("K" if rights.wks else "") + ("Q" if rights.wqs else "") + \
+                   ("k" if rights.bks else "") + ("q" if rights.bqs else "")
+        if self.enPassantPossible:
+            enPassant = Move.colsToFiles[self.enPassantPossible[1]] + Move.rowsToRanks[self.enPassantPossible[0]]
+        else:
+            enPassant = "-"
+        return (f"{'/'.join(ranks)} {'w' if self.whiteToMove else 'b'} {castling or '-'} {enPassant} "
+                f"{self.halfmoveClock} {self.fullmoveNumber}")
+
+    def snapshot(self):
+        """
+        A small picklable copy of the position for another process: the FEN plus the Zobrist
+        keys since the last irreversible move, which is all repetition detection looks at.
+        fromSnapshot rebuilds it.
+        """
+        return self.to_fen(), self.zobristKeyLog[-(self.halfmoveClock + 1):]
+
+    @classmethod
+    def fromSnapshot(cls, snapshot):
+        """
+        Builds a GameState from snapshot(): repetitions of the earlier positions are still
+        detected, but undoMove can't go back past this position.
+        """
+        fen, keyHistory = snapshot
+        gs = cls.from_fen(fen)
+        gs.zobristKeyLog = list(keyHistory)
+        return gs
+
+    def refreshFromBoard(self):
+        """
+        Recomputes the bitboards, the Zobrist key and the evaluation sums from self.board.
+        Call after editing the board directly.
+        """
+        self.pieceBitboards = {piece: 0 for piece in PIECES}
+        self.colorBitboards = {'w': 0, 'b': 0}
+        self.mgScore = self.egScore = self.gamePhase = 0
+        key = 0
+        for r in range(8):
+            for c in range(8):
+                piece = self.board[r][c]
+                if piece != "--":
+                    sq = r * 8 + c
+                    self.pieceBitboards[piece] |= SQUARE_BB[sq]
+                    self.colorBitboards[piece[0]] |= SQUARE_BB[sq]
+                    key ^= PIECE_KEYS[piece][sq]
+                    self.mgScore += MG_TABLE[piece][sq]
+                    self.egScore += EG_TABLE[piece][sq]
+                    self.gamePhase += PIECE_PHASE[piece]
+        if not self.whiteToMove:
+            key ^= BLACK_TO_MOVE_KEY
+        self.zobristKey = key ^ CASTLING_KEYS[castlingIndex(self.currentCastlingRight)] ^ self._enPassantKey()
+
+    def _enPassantKey(self):
+        """
+        Hash contribution of the en passant square. It only counts when the side to move
+        has a pawn that could capture, so otherwise identical positions hash the same.
+        """
+        if not self.enPassantPossible:
+            return 0
+        epRow, epCol = self.enPassantPossible
+        allyColor, enemyColor = ('w', 'b') if self.whiteToMove else ('b', 'w')
+        if PAWN_ATTACKS[enemyColor][epRow * 8 + epCol] & self.pieceBitboards[allyColor + 'P']:
+            return EN_PASSANT_KEYS[epCol]
+        return 0
+
+    def _addPiece(self, piece, sq):
+        self.pieceBitboards[piece] |= SQUARE_BB[sq]
+        self.colorBitboards[piece[0]] |= SQUARE_BB[sq]
+        self.zobristKey ^= PIECE_KEYS[piece][sq]
+        self.mgScore += MG_TABLE[piece][sq]
+        self.egScore += EG_TABLE[piece][sq]
+        self.gamePhase += PIECE_PHASE[piece]
+
+    def _removePiece(self, piece, sq):
+        self.pieceBitboards[piece] &= ~SQUARE_BB[sq]
+        self.colorBitboards[piece[0]] &= ~SQUARE_BB[sq]
+        self.zobristKey ^= PIECE_KEYS[piece][sq]
+        self.mgScore -= MG_TABLE[piece][sq]
+        self.egScore -= EG_TABLE[piece][sq]
+        self.gamePhase -= PIECE_PHASE[piece]
 
     def makeMove(self, move):
         """
         Executes a move on the board (standard moves, en passant, promotion, castling).
         """
+        startSq = move.startRow * 8 + move.startCol
+        endSq = move.endRow * 8 + move.endCol
+        # Take the old castling rights and en passant square out of the hash (pieces are hashed as they move)
+        self.zobristKey ^= CASTLING_KEYS[castlingIndex(self.currentCastlingRight)] ^ self._enPassantKey()
         self.board[move.startRow][move.startCol] = "--"
         self.board[move.endRow][move.endCol] = move.pieceMoved
+        self._removePiece(move.pieceMoved, startSq)
+        if move.pieceCaptured != "--" and not move.isEnPassantMove:
+            self._removePiece(move.pieceCaptured, endSq)
         self.moveLog.append(move)
         self.whiteToMove = not self.whiteToMove
+        # Captures and pawn moves reset the fifty-move clock
+        if move.pieceMoved[1] == 'P' or move.pieceCaptured != "--":
+            self.halfmoveClock = 0
+        else:
+            self.halfmoveClock += 1
+        self.halfmoveClockLog.append(self.halfmoveClock)
+        if self.whiteToMove:
+            self.fullmoveNumber += 1 # Black just moved
         
         # Track King location for check validation
         if move.pieceMoved == 'wK':
@@ -54,10 +320,12 @@ class GameState:
         # Handle Pawn Promotion
         if move.isPawnPromotion:
             self.board[move.endRow][move.endCol] = move.pieceMoved[0] + move.promotionChoice
+        self._addPiece(self.board[move.endRow][move.endCol], endSq)
 
         # Handle En Passant capture
         if move.isEnPassantMove:
             self.board[move.startRow][move.endCol] = "--"
+            self._removePiece(move.pieceCaptured, move.startRow * 8 + move.endCol)
         
         # Update en passant possibilities
         self.enPassantPossibleLog.append(self.enPassantPossible)
@@ -69,16 +337,24 @@ class GameState:
         # Execute Castle move
         if move.isCastleMove:
             if move.endCol - move.startCol == 2: # Kingside
-                self.board[move.endRow][move.endCol - 1] = self.board[move.endRow][move.endCol + 1]
+                rook = self.board[move.endRow][move.endCol + 1]
+                self.board[move.endRow][move.endCol - 1] = rook
                 self.board[move.endRow][move.endCol + 1] = '--'
+                self._removePiece(rook, endSq + 1)
+                self._addPiece(rook, endSq - 1)
             else: # Queenside
-                self.board[move.endRow][move.endCol + 1] = self.board[move.endRow][move.endCol - 2]
+                rook = self.board[move.endRow][move.endCol - 2]
+                self.board[move.endRow][move.endCol + 1] = rook
                 self.board[move.endRow][move.endCol - 2] = '--'
+                self._removePiece(rook, endSq - 2)
+                self._addPiece(rook, endSq + 1)
 
         # Update castling rights and logs
         self.updateCastleRights(move)
         self.castleRightsLog.append(CastleRights(self.currentCastlingRight.wks, self.currentCastlingRight.bks, 
                                                  self.currentCastlingRight.wqs, self.currentCastlingRight.bqs))
+        self.zobristKey ^= BLACK_TO_MOVE_KEY ^ CASTLING_KEYS[castlingIndex(self.currentCastlingRight)] ^ self._enPassantKey()
+        self.zobristKeyLog.append(self.zobristKey)
         
     def undoMove(self):
         """
@@ -86,10 +362,19 @@ class GameState:
         """
         if len(self.moveLog) != 0:
             lastMove = self.moveLog.pop()
+            startSq = lastMove.startRow * 8 + lastMove.startCol
+            endSq = lastMove.endRow * 8 + lastMove.endCol
+            self.zobristKey ^= BLACK_TO_MOVE_KEY ^ CASTLING_KEYS[castlingIndex(self.currentCastlingRight)] ^ self._enPassantKey()
             
+            self._removePiece(self.board[lastMove.endRow][lastMove.endCol], endSq)
+            self._addPiece(lastMove.pieceMoved, startSq)
             self.board[lastMove.startRow][lastMove.startCol] = lastMove.pieceMoved
             self.board[lastMove.endRow][lastMove.endCol] = lastMove.pieceCaptured
+            if self.whiteToMove:
+                self.fullmoveNumber -= 1 # Undoing a Black move
             self.whiteToMove = not self.whiteToMove
+            self.halfmoveClockLog.pop()
+            self.halfmoveClock = self.halfmoveClockLog[-1]
             
             # Revert King location
             if lastMove.pieceMoved == 'wK':
@@ -101,6 +386,9 @@ class GameState:
             if lastMove.isEnPassantMove:
                 self.board[lastMove.endRow][lastMove.endCol] = "--"
                 self.board[lastMove.startRow][lastMove.endCol] = lastMove.pieceCaptured
+                self._addPiece(lastMove.pieceCaptured, lastMove.startRow * 8 + lastMove.endCol)
+            elif lastMove.pieceCaptured != "--":
+                self._addPiece(lastMove.pieceCaptured, endSq)
             
             self.enPassantPossible = self.enPassantPossibleLog.pop()
             
@@ -112,14 +400,25 @@ class GameState:
             # Undo Castle piece movements
             if lastMove.isCastleMove:
                 if lastMove.endCol - lastMove.startCol == 2: # Kingside
-                    self.board[lastMove.endRow][lastMove.endCol+1] = self.board[lastMove.endRow][lastMove.endCol-1]
+                    rook = self.board[lastMove.endRow][lastMove.endCol-1]
+                    self.board[lastMove.endRow][lastMove.endCol+1] = rook
                     self.board[lastMove.endRow][lastMove.endCol-1] = '--'
+                    self._removePiece(rook, endSq - 1)
+                    self._addPiece(rook, endSq + 1)
                 else: # Queenside
-                    self.board[lastMove.endRow][lastMove.endCol-2] = self.board[lastMove.endRow][lastMove.endCol+1]
+                    rook = self.board[lastMove.endRow][lastMove.endCol+1]
+                    self.board[lastMove.endRow][lastMove.endCol-2] = rook
                     self.board[lastMove.endRow][lastMove.endCol+1] = '--'
+                    self._removePiece(rook, endSq + 1)
+                    self._addPiece(rook, endSq - 2)
+
+            self.zobristKey ^= CASTLING_KEYS[castlingIndex(self.currentCastlingRight)] ^ self._enPassantKey()
+            self.zobristKeyLog.pop()
 
             self.checkMate = False
             self.staleMate = False
+            self.repetitionDraw = False
+            self.fiftyMoveDraw = False
     
     def updateCastleRights(self, move):
         """
@@ -162,29 +461,9 @@ class GameState:
         """
         Returns all moves that do not result in the King being in check.
         """
-        tempEnPassantPossible = self.enPassantPossible
-        tempCastleRights = CastleRights(self.currentCastlingRight.wks, self.currentCastlingRight.bks, 
-                                        self.currentCastlingRight.wqs, self.currentCastlingRight.bqs)
+        moves = [Move.fromCode(code, self.board) for code in self.generateLegalMoves()]
         
-        # 1. Generate all possible moves
-        moves = self.getAllPossibleMoves()
-        
-        # Add Castle moves
-        if self.whiteToMove:
-            self.getCastleMoves(self.whiteKingLocation[0], self.whiteKingLocation[1], moves)
-        else:
-            self.getCastleMoves(self.blackKingLocation[0], self.blackKingLocation[1], moves)
-            
-        # 2. Filter out moves that lead to check
-        for i in range(len(moves) - 1, -1, -1):
-            self.makeMove(moves[i])
-            self.whiteToMove = not self.whiteToMove # Switch to validate current player's King
-            if self.inCheck():
-                moves.remove(moves[i])
-            self.whiteToMove = not self.whiteToMove # Switch back
-            self.undoMove()
-        
-        # Check for Checkmate or Stalemate
+        # Check for Checkmate or Stalemate, then for draws (checkmate on the 100th ply still wins)
         if not moves:
             if self.inCheck():
                 self.checkMate = True
@@ -193,10 +472,394 @@ class GameState:
         else:
             self.checkMate = False
             self.staleMate = False
-            
-        self.enPassantPossible = tempEnPassantPossible
-        self.currentCastlingRight = tempCastleRights
+        self.repetitionDraw = bool(moves) and self.isRepetition(3)
+        self.fiftyMoveDraw = bool(moves) and self.halfmoveClock >= FIFTY_MOVE_PLIES
         return moves
+
+    def enableMoveCache(self, maxEntries=4096, cache=None):
+        """
+        Turns on the legal move cache: generateLegalMoves answers positions it has seen
+        before (same zobristKey) from the cache. Pass cache to share one MoveCache between
+        several GameStates. Returns the cache, for its hit/miss counters.
+        """
+        self.moveCache = cache if cache is not None else MoveCache(maxEntries)
+        return self.moveCache
+
+    def isRepetition(self, times=2):
+        """
+        True if the current position has occurred at least times times (including now).
+        Positions before the last capture or pawn move can't repeat, so only the last
+        halfmoveClock entries of zobristKeyLog are scanned, and only those with the same side to move.
+        """
+        key = self.zobristKey
+        log = self.zobristKeyLog
+        oldest = max(0, len(log) - 1 - self.halfmoveClock)
+        count = 1
+        for i in range(len(log) - 3, oldest - 1, -2):
+            if log[i] == key:
+                count += 1
+                if count >= times:
+                    return True
+        return False
+
+    def makeMoveCode(self, code):
+        """
+        Plays a packed move from generateLegalMoves. The Move object is only built here, for the log.
+        """
+        self.makeMove(Move.fromCode(code, self.board))
+
+    def generateLegalMoves(self):
+        """
+        Legal moves as a new list of packed ints (see encodeMove), from the move cache when enabled.
+        """
+        if self.moveCache is None:
+            return self._generateLegalMoves()
+        codes = self.moveCache.get(self.zobristKey)
+        if codes is None:
+            codes = tuple(self._generateLegalMoves())
+            self.moveCache.put(self.zobristKey, codes)
+        return list(codes)
+
+    def _generateLegalMoves(self):
+        """
+        Generates only legal moves, as packed ints (see encodeMove), without touching the board.
+        Checkers and pinned pieces are computed once, then every piece's targets are
+        masked so that it blocks/captures a single checker and stays on its pin line.
+        Promotions are emitted once per promotion piece.
+        """
+        context = self._legalMoveContext()
+        allyColor, checkers = context[0], context[3]
+        targetSquares = ~self.colorBitboards[allyColor] & FULL_BOARD
+        moves = []
+        self._kingMoves(context, targetSquares, True, moves)
+        if checkers & (checkers - 1):
+            return moves # Double check: only the King can move
+        pieces = self.pieceBitboards
+        for piece in ('N', 'B', 'R', 'Q'):
+            self._pieceMoves(piece, pieces[allyColor + piece], context, targetSquares, moves)
+        self._pawnMoves(pieces[allyColor + 'P'], context, True, True, moves)
+        return moves
+
+    def iterLegalMoves(self, order=MOVE_STAGES, hashMove=0):
+        """
+        Yields legal moves as packed ints, one stage at a time, doing each stage's work only
+        when the caller asks for its first move. order lists the stages to run:
+        "hash" (hashMove, if it is legal here), "captures" (captures and promotions, most
+        valuable victim / least valuable attacker first) and "quiets" (everything else,
+        validated piece by piece as they are reached). hashMove is never repeated by the
+        later stages, even when the "hash" stage isn't run. A search that cuts off on the
+        hash move or a capture never generates its quiet moves.
+        """
+        context = self._legalMoveContext()
+        for stage in order:
+            if stage == "hash":
+                # An illegal hash move (e.g. from a key collision) is dropped
+                if hashMove and self.isLegalMove(hashMove, context):
+                    yield hashMove
+            elif stage == "captures":
+                scored = []
+                for sq in self._allySquares(context[0]):
+                    attacker = _PIECE_RANK[self.board[sq >> 3][sq & 7][1]]
+                    for code in self._movesFrom(sq, context, quiet=False):
+                        endSq = code >> 6 & 63
+                        score = 0
+                        if code & CAPTURE_FLAG:
+                            victim = 'P' if code >> 12 == EN_PASSANT else self.board[endSq >> 3][endSq & 7][1]
+                            score = 100 + _PIECE_RANK[victim] * 10 - attacker
+                        if code >> 12 & PROMOTION:
+                            score += 50 + (code >> 12 & 3) # Queen promotions first
+                        scored.append((score, code))
+                scored.sort(reverse=True)
+                for _, code in scored:
+                    if code != hashMove:
+                        yield code
+            elif stage == "quiets":
+                for sq in self._allySquares(context[0]):
+                    for code in self._movesFrom(sq, context, noisy=False):
+                        if code != hashMove:
+                            yield code
+            else:
+                raise ValueError(f"Unknown move stage '{stage}'")
+
+    def isLegalMove(self, code, context=None):
+        """
+        True if the packed move is legal here, flags included: checks only the moving piece's
+        moves, so it is cheap for a move from elsewhere (a hash move, a move read from a file).
+        context is this position's _legalMoveContext, when the caller already has it.
+        """
+        startSq = code & 63
+        piece = self.board[startSq >> 3][startSq & 7]
+        if context is None:
+            context = self._legalMoveContext()
+        isNoisy = bool(code & CAPTURE_FLAG or code >> 12 & PROMOTION)
+        return piece[0] == context[0] and code in self._movesFrom(startSq, context, isNoisy, not isNoisy)
+
+    def _legalMoveContext(self):
+        """
+        What every move's legality check needs, computed once per position:
+        (allyColor, enemyColor, kingSq, checkers, checkMask, pinLines).
+        """
+        if self.whiteToMove:
+            allyColor, enemyColor = 'w', 'b'
+            kingSq = self.whiteKingLocation[0] * 8 + self.whiteKingLocation[1]
+        else:
+            allyColor, enemyColor = 'b', 'w'
+            kingSq = self.blackKingLocation[0] * 8 + self.blackKingLocation[1]
+        own = self.colorBitboards[allyColor]
+        occupied = own | self.colorBitboards[enemyColor]
+        checkers = self.attackersTo(kingSq, occupied, enemyColor)
+        if checkers:
+            checkMask = checkers | BETWEEN[kingSq][checkers.bit_length() - 1]
+        else:
+            checkMask = ~own & FULL_BOARD
+        return allyColor, enemyColor, kingSq, checkers, checkMask, self.getPins(kingSq, allyColor, enemyColor)
+
+    def _allySquares(self, allyColor):
+        """
+        Squares of allyColor's pieces: minor and major pieces, then pawns, then the King
+        (the most expensive to validate and rarely the best quiet move).
+        """
+        for piece in ('N', 'B', 'R', 'Q', 'P', 'K'):
+            bb = self.pieceBitboards[allyColor + piece]
+            while bb:
+                low = bb & -bb
+                bb ^= low
+                yield low.bit_length() - 1
+
+    def _movesFrom(self, sq, context, noisy=True, quiet=True):
+        """
+        Legal moves of the piece on sq, given the position's _legalMoveContext: captures and
+        promotions when noisy, the remaining moves (including castling) when quiet.
+        """
+        allyColor, enemyColor, kingSq, checkers = context[:4]
+        piece = self.board[sq >> 3][sq & 7][1]
+        moves = []
+        if piece != 'K' and checkers & (checkers - 1):
+            return moves # Double check: only the King can move
+        if piece == 'P':
+            self._pawnMoves(SQUARE_BB[sq], context, noisy, quiet, moves)
+            return moves
+        own = self.colorBitboards[allyColor]
+        enemy = self.colorBitboards[enemyColor]
+        targetSquares = (enemy if noisy else 0) | (~(own | enemy) & FULL_BOARD if quiet else 0)
+        if piece == 'K':
+            self._kingMoves(context, targetSquares, quiet, moves)
+        else:
+            self._pieceMoves(piece, SQUARE_BB[sq], context, targetSquares, moves)
+        return moves
+
+    def _kingMoves(self, context, targetSquares, castling, moves):
+        """
+        Appends the King's legal steps onto targetSquares and, with castling, its legal castles.
+        """
+        allyColor, enemyColor, kingSq, checkers = context[:4]
+        enemy = self.colorBitboards[enemyColor]
+        occupied = self.colorBitboards[allyColor] | enemy
+        # The King itself must not block the ray of a slider attacking it
+        occupiedWithoutKing = occupied ^ SQUARE_BB[kingSq]
+        targets = KING_ATTACKS[kingSq] & targetSquares
+        while targets:
+            low = targets & -targets
+            endSq = low.bit_length() - 1
+            targets ^= low
+            if not self.isSquareAttacked(endSq, occupiedWithoutKing, enemyColor):
+                moves.append(kingSq | endSq << 6 | (CAPTURE_FLAG if low & enemy else 0))
+        if castling and not checkers:
+            # Castling: the King may not pass through or land on an attacked square
+            rights = self.currentCastlingRight
+            if rights.wks if allyColor == 'w' else rights.bks:
+                if not occupied & (SQUARE_BB[kingSq + 1] | SQUARE_BB[kingSq + 2]) and \
+                        not self.isSquareAttacked(kingSq + 1, occupied, enemyColor) and \
+                        not self.isSquareAttacked(kingSq + 2, occupied, enemyColor):
+                    moves.append(encodeMove(kingSq, kingSq + 2, KING_CASTLE))
+            if rights.wqs if allyColor == 'w' else rights.bqs:
+                if not occupied & (SQUARE_BB[kingSq - 1] | SQUARE_BB[kingSq - 2] | SQUARE_BB[kingSq - 3]) and \
+                        not self.isSquareAttacked(kingSq - 1, occupied, enemyColor) and \
+                        not self.isSquareAttacked(kingSq - 2, occupied, enemyColor):
+                    moves.append(encodeMove(kingSq, kingSq - 2, QUEEN_CASTLE))
+
+    def _pieceMoves(self, piece, fromSquares, context, targetSquares, moves):
+        """
+        Appends the legal moves onto targetSquares of the Knights, Bishops, Rooks or Queens
+        (piece type letter) on the fromSquares bitboard. Not for use in double check.
+        """
+        allyColor, enemyColor, kingSq, checkers, checkMask, pinLines = context
+        enemy = self.colorBitboards[enemyColor]
+        occupied = self.colorBitboards[allyColor] | enemy
+        targetSquares &= checkMask
+        attacks = _PIECE_ATTACKS[piece]
+        while fromSquares:
+            low = fromSquares & -fromSquares
+            sq = low.bit_length() - 1
+            fromSquares ^= low
+            targets = attacks(sq, occupied) & targetSquares
+            if sq in pinLines:
+                targets &= pinLines[sq]
+            while targets:
+                low = targets & -targets
+                targets ^= low
+                moves.append(sq | (low.bit_length() - 1) << 6 | (CAPTURE_FLAG if low & enemy else 0))
+
+    def _pawnMoves(self, pawns, context, noisy, quiet, moves):
+        """
+        Appends the legal moves of the pawns on the pawns bitboard: captures, promotions and
+        en passant when noisy, the other pushes when quiet. Not for use in double check.
+        """
+        allyColor, enemyColor, kingSq, checkers, checkMask, pinLines = context
+        enemy = self.colorBitboards[enemyColor]
+        occupied = self.colorBitboards[allyColor] | enemy
+        step, startRow, lastRow = (-1, 6, 0) if allyColor == 'w' else (1, 1, 7)
+        epSq = self.enPassantPossible[0] * 8 + self.enPassantPossible[1] if self.enPassantPossible else -1
+        while pawns:
+            low = pawns & -pawns
+            sq = low.bit_length() - 1
+            pawns ^= low
+            allowed = checkMask & pinLines.get(sq, FULL_BOARD)
+            pushSq = sq + 8 * step
+            pushFree = not occupied & SQUARE_BB[pushSq]
+            if noisy:
+                targets = PAWN_ATTACKS[allyColor][sq] & enemy & allowed
+                if pushFree and pushSq >> 3 == lastRow:
+                    targets |= SQUARE_BB[pushSq] & allowed
+                while targets:
+                    low = targets & -targets
+                    endSq = low.bit_length() - 1
+                    targets ^= low
+                    flags = CAPTURE if low & enemy else QUIET_MOVE
+                    if endSq >> 3 == lastRow:
+                        for promotion in 'QRBN':
+                            moves.append(encodeMove(sq, endSq, flags | PROMOTION_CODES[promotion]))
+                    else:
+                        moves.append(encodeMove(sq, endSq, flags))
+                if epSq >= 0 and PAWN_ATTACKS[allyColor][sq] & SQUARE_BB[epSq] and \
+                        self._isLegalEnPassant(sq, epSq, kingSq, checkMask):
+                    moves.append(encodeMove(sq, epSq, EN_PASSANT))
+            if quiet and pushFree and pushSq >> 3 != lastRow:
+                if allowed & SQUARE_BB[pushSq]:
+                    moves.append(encodeMove(sq, pushSq))
+                doubleSq = pushSq + 8 * step
+                if sq >> 3 == startRow and not occupied & SQUARE_BB[doubleSq] and allowed & SQUARE_BB[doubleSq]:
+                    moves.append(encodeMove(sq, doubleSq, DOUBLE_PAWN_PUSH))
+
+    def hasAnyLegalMove(self):
+        """
+        True if the side to move has at least one legal move. Stops at the first one found:
+        King steps first (they decide most checks), then for every other piece only whether
+        its masked target bitboard is non-empty, without listing the moves. Castling never
+        needs checking, since a legal castle implies a legal one-square King step.
+        """
+        pieces = self.pieceBitboards
+        if self.whiteToMove:
+            allyColor, enemyColor, step, startRow = 'w', 'b', -1, 6
+            kingSq = self.whiteKingLocation[0] * 8 + self.whiteKingLocation[1]
+        else:
+            allyColor, enemyColor, step, startRow = 'b', 'w', 1, 1
+            kingSq = self.blackKingLocation[0] * 8 + self.blackKingLocation[1]
+        own = self.colorBitboards[allyColor]
+        enemy = self.colorBitboards[enemyColor]
+        occupied = own | enemy
+
+        occupiedWithoutKing = occupied ^ SQUARE_BB[kingSq]
+        targets = KING_ATTACKS[kingSq] & ~own
+        while targets:
+            low = targets & -targets
+            targets ^= low
+            if not self.isSquareAttacked(low.bit_length() - 1, occupiedWithoutKing, enemyColor):
+                return True
+        checkers, checkMask, pinLines = self._legalMoveContext()[3:]
+        if checkers & (checkers - 1):
+            return False # Double check and the King can't move
+
+        bb = pieces[allyColor + 'P']
+        while bb:
+            low = bb & -bb
+            sq = low.bit_length() - 1
+            bb ^= low
+            allowed = checkMask & pinLines.get(sq, FULL_BOARD)
+            pushSq = sq + 8 * step
+            if not occupied & SQUARE_BB[pushSq]:
+                if allowed & SQUARE_BB[pushSq]:
+                    return True
+                doubleSq = pushSq + 8 * step
+                if sq >> 3 == startRow and not occupied & SQUARE_BB[doubleSq] and allowed & SQUARE_BB[doubleSq]:
+                    return True
+            if PAWN_ATTACKS[allyColor][sq] & enemy & allowed:
+                return True
+        for piece in ('N', 'B', 'R', 'Q'):
+            bb = pieces[allyColor + piece]
+            attacks = _PIECE_ATTACKS[piece]
+            while bb:
+                low = bb & -bb
+                sq = low.bit_length() - 1
+                bb ^= low
+                if piece == 'N' and sq in pinLines:
+                    continue # A pinned Knight can never move
+                if attacks(sq, occupied) & checkMask & pinLines.get(sq, FULL_BOARD):
+                    return True
+
+        # En passant last: rare, and the only move needing a full occupancy test
+        if self.enPassantPossible:
+            epSq = self.enPassantPossible[0] * 8 + self.enPassantPossible[1]
+            bb = PAWN_ATTACKS[enemyColor][epSq] & pieces[allyColor + 'P']
+            while bb:
+                low = bb & -bb
+                bb ^= low
+                if self._isLegalEnPassant(low.bit_length() - 1, epSq, kingSq, checkMask):
+                    return True
+        return False
+
+    def isCheckmate(self):
+        """
+        True if the side to move is in check with no legal move (without generating the move list).
+        """
+        return self.inCheck() and not self.hasAnyLegalMove()
+
+    def isStalemate(self):
+        """
+        True if the side to move is not in check but has no legal move.
+        """
+        return not self.inCheck() and not self.hasAnyLegalMove()
+
+    def getPins(self, kingSq, allyColor, enemyColor):
+        """
+        Returns {square: line bitboard} for every ally piece pinned to its King.
+        A pinned piece may only move along the line between its King and the pinner.
+        """
+        pieces = self.pieceBitboards
+        own = self.colorBitboards[allyColor]
+        enemy = self.colorBitboards[enemyColor]
+        queens = pieces[enemyColor + 'Q']
+        # Look through our own pieces to find enemy sliders lined up with the King
+        snipers = (rookAttacks(kingSq, enemy) & (pieces[enemyColor + 'R'] | queens)) | \
+                  (bishopAttacks(kingSq, enemy) & (pieces[enemyColor + 'B'] | queens))
+        pinLines = {}
+        while snipers:
+            low = snipers & -snipers
+            sniperSq = low.bit_length() - 1
+            snipers ^= low
+            blockers = BETWEEN[kingSq][sniperSq] & (own | enemy)
+            if blockers and not blockers & (blockers - 1) and blockers & own:
+                pinLines[blockers.bit_length() - 1] = LINE[kingSq][sniperSq]
+        return pinLines
+
+    def _isLegalEnPassant(self, fromSq, epSq, kingSq, checkMask):
+        """
+        En passant removes two pieces from the same rank, so it can expose the King to a
+        slider even when neither pawn is pinned on its own. Checked on a copy of the occupancy.
+        """
+        capturedSq = fromSq & ~7 | (epSq & 7) # Same row as the capturing pawn, same column as the target
+        if not checkMask & (SQUARE_BB[epSq] | SQUARE_BB[capturedSq]):
+            return False # Neither captures the checker nor blocks the check
+        enemyColor = 'b' if self.whiteToMove else 'w'
+        pieces = self.pieceBitboards
+        occupied = (self.colorBitboards['w'] | self.colorBitboards['b']) \
+            ^ SQUARE_BB[fromSq] ^ SQUARE_BB[capturedSq] | SQUARE_BB[epSq]
+        queens = pieces[enemyColor + 'Q']
+        if rookAttacks(kingSq, occupied) & (pieces[enemyColor + 'R'] | queens):
+            return False
+        if bishopAttacks(kingSq, occupied) & (pieces[enemyColor + 'B'] | queens):
+            return False
+        return True
     
     def inCheck(self):
         """
@@ -209,201 +872,127 @@ class GameState:
     def squareUnderAttack(self, r, c):
         """
         Determines if a square is being attacked by the opponent.
-        Optimized to look outwards from the square instead of generating all opponent moves.
+        Looks outwards from the square using the precomputed attack tables and the enemy bitboards.
         """
-        enemyColor = "b" if self.whiteToMove else "w"
+        enemyColor = 'b' if self.whiteToMove else 'w'
+        return self.isSquareAttacked(r * 8 + c, self.colorBitboards['w'] | self.colorBitboards['b'], enemyColor)
+
+    def isSquareAttacked(self, sq, occupied, byColor):
+        """
+        Returns True if any byColor piece attacks sq, with sliders blocked by the given occupancy.
+        """
+        pieces = self.pieceBitboards
+        targetColor = 'b' if byColor == 'w' else 'w'
         
-        # 1. Check outward for Rooks and Queens (horizontal/vertical)
-        directions = ((-1, 0), (0, -1), (1, 0), (0, 1))
-        for d in directions:
-            for i in range(1, 8):
-                endRow, endCol = r + d[0] * i, c + d[1] * i
-                if 0 <= endRow < 8 and 0 <= endCol < 8:
-                    endPiece = self.board[endRow][endCol]
-                    if endPiece == "--":
-                        continue
-                    elif endPiece[0] == enemyColor and endPiece[1] in ('R', 'Q'):
-                        return True
-                    else:
-                        break # Blocked by own piece or non-sliding enemy
-                else:
-                    break
-                    
-        # 2. Check outward for Bishops and Queens (diagonal)
-        directions = ((-1, -1), (-1, 1), (1, -1), (1, 1))
-        for d in directions:
-            for i in range(1, 8):
-                endRow, endCol = r + d[0] * i, c + d[1] * i
-                if 0 <= endRow < 8 and 0 <= endCol < 8:
-                    endPiece = self.board[endRow][endCol]
-                    if endPiece == "--":
-                        continue
-                    elif endPiece[0] == enemyColor and endPiece[1] in ('B', 'Q'):
-                        return True
-                    else:
-                        break # Blocked
-                else:
-                    break
-                    
-        # 3. Check for Knights
-        knightMoves = ((-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1))
-        for m in knightMoves:
-            endRow, endCol = r + m[0], c + m[1]
-            if 0 <= endRow < 8 and 0 <= endCol < 8:
-                endPiece = self.board[endRow][endCol]
-                if endPiece[0] == enemyColor and endPiece[1] == 'N':
-                    return True
-                    
-        # 4. Check for Pawns
-        # Opponent pawns attack diagonally downwards if whiteToMove (enemy is Black)
-        pawnRowOffset = -1 if self.whiteToMove else 1
-        endRow = r + pawnRowOffset
-        if 0 <= endRow < 8:
-            for colOffset in (-1, 1):
-                endCol = c + colOffset
-                if 0 <= endCol < 8:
-                    endPiece = self.board[endRow][endCol]
-                    if endPiece[0] == enemyColor and endPiece[1] == 'P':
-                        return True
-                        
-        # 5. Check for Enemy King
-        kingMoves = ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1))
-        for m in kingMoves:
-            endRow, endCol = r + m[0], c + m[1]
-            if 0 <= endRow < 8 and 0 <= endCol < 8:
-                endPiece = self.board[endRow][endCol]
-                if endPiece[0] == enemyColor and endPiece[1] == 'K':
-                    return True
-                    
+        # Knights, Pawns and the King: a piece attacks sq if sq attacks it back with the same pattern
+        if KNIGHT_ATTACKS[sq] & pieces[byColor + 'N']:
+            return True
+        if PAWN_ATTACKS[targetColor][sq] & pieces[byColor + 'P']:
+            return True
+        if KING_ATTACKS[sq] & pieces[byColor + 'K']:
+            return True
+        
+        # Sliding pieces, stopping at the first blocker in each direction
+        queens = pieces[byColor + 'Q']
+        if rookAttacks(sq, occupied) & (pieces[byColor + 'R'] | queens):
+            return True
+        if bishopAttacks(sq, occupied) & (pieces[byColor + 'B'] | queens):
+            return True
         return False
+
+    def attackersTo(self, sq, occupied, byColor):
+        """
+        Returns a bitboard of every byColor piece attacking sq, with sliders blocked by the given occupancy.
+        """
+        pieces = self.pieceBitboards
+        targetColor = 'b' if byColor == 'w' else 'w'
+        queens = pieces[byColor + 'Q']
+        return (KNIGHT_ATTACKS[sq] & pieces[byColor + 'N']) | \
+               (PAWN_ATTACKS[targetColor][sq] & pieces[byColor + 'P']) | \
+               (KING_ATTACKS[sq] & pieces[byColor + 'K']) | \
+               (rookAttacks(sq, occupied) & (pieces[byColor + 'R'] | queens)) | \
+               (bishopAttacks(sq, occupied) & (pieces[byColor + 'B'] | queens))
     
     def getAllPossibleMoves(self):
         """
         Generates all moves without filtering for King safety.
         """
         moves = []
-        for r in range(len(self.board)):
-            for c in range(len(self.board[r])):
-                turn = self.board[r][c][0]
-                if (turn == 'w' and self.whiteToMove) or (turn == 'b' and not self.whiteToMove):
-                    piece = self.board[r][c][1]
-                    if piece == 'P':
-                        self.getPawnMoves(r, c, moves)
-                    elif piece == 'R':
-                        self.getRookMoves(r, c, moves)
-                    elif piece == 'N':
-                        self.getKnightMoves(r, c, moves)
-                    elif piece == 'B':
-                        self.getBishopMoves(r, c, moves)
-                    elif piece == 'Q':
-                        self.getQueenMoves(r, c, moves)
-                    elif piece == 'K':
-                        self.getKingMoves(r, c, moves)
+        allyColor = 'w' if self.whiteToMove else 'b'
+        moveFunctions = (('P', self.getPawnMoves), ('N', self.getKnightMoves), ('B', self.getBishopMoves),
+                         ('R', self.getRookMoves), ('Q', self.getQueenMoves), ('K', self.getKingMoves))
+        for piece, moveFunction in moveFunctions:
+            bb = self.pieceBitboards[allyColor + piece]
+            while bb:
+                low = bb & -bb
+                sq = low.bit_length() - 1
+                bb ^= low
+                moveFunction(sq >> 3, sq & 7, moves)
         return moves
         
     def scoreBoard(self):
         """
-        Calculates the material score of the board. Positive favors White, negative favors Black.
+        Returns the evaluation in centipawns. Positive favors White, negative favors Black.
+        Material plus piece-square tables, blended between middlegame and endgame by the
+        remaining material. The sums are kept up to date by makeMove/undoMove, so this is O(1).
         """
-        pieceValues = {"K": 0, "Q": 9, "R": 5, "B": 3, "N": 3, "P": 1}
-        score = 0
-        for row in self.board:
-            for square in row:
-                if square[0] == 'w':
-                    score += pieceValues[square[1]]
-                elif square[0] == 'b':
-                    score -= pieceValues[square[1]]
-        return score
+        return taperedScore(self.mgScore, self.egScore, self.gamePhase)
+
+    def _addTargets(self, r, c, targets, moves):
+        """
+        Appends a Move from (r, c) to every square set in the targets bitboard.
+        """
+        while targets:
+            low = targets & -targets
+            sq = low.bit_length() - 1
+            targets ^= low
+            moves.append(Move((r, c), (sq >> 3, sq & 7), self.board))
     
     def getPawnMoves(self, r, c, moves):
         """
         Handles pawn movement, diagonal captures, and en passant.
         """
+        sq = r * 8 + c
         if self.whiteToMove:
-            if self.board[r-1][c] == "--": # 1 square advance
-                moves.append(Move((r, c), (r-1, c), self.board))
-                if r == 6 and self.board[r-2][c] == "--": # 2 square advance
-                    moves.append(Move((r, c), (r-2, c), self.board))
-            if c-1 >= 0: # Left capture
-                if self.board[r-1][c-1][0] == 'b':
-                    moves.append(Move((r, c), (r-1, c-1), self.board))
-                elif (r-1, c-1) == self.enPassantPossible:
-                    moves.append(Move((r, c), (r-1, c-1), self.board, isEnPassantMove=True))
-            if c+1 <= 7: # Right capture
-                if self.board[r-1][c+1][0] == 'b':
-                    moves.append(Move((r, c), (r-1, c+1), self.board))
-                elif (r-1, c+1) == self.enPassantPossible:
-                    moves.append(Move((r, c), (r-1, c+1), self.board, isEnPassantMove=True))
-
-        else: # Black pawn moves
-            if self.board[r+1][c] == "--": # 1 square advance
-                moves.append(Move((r, c), (r+1, c), self.board))
-                if r == 1 and self.board[r+2][c] == "--": # 2 square advance
-                    moves.append(Move((r, c), (r+2, c), self.board))
-            if c-1 >= 0: # Left capture
-                if self.board[r+1][c-1][0] == 'w':
-                    moves.append(Move((r, c), (r+1, c-1), self.board))
-                elif (r+1, c-1) == self.enPassantPossible:
-                    moves.append(Move((r, c), (r+1, c-1), self.board, isEnPassantMove=True))
-            if c+1 <= 7: # Right capture
-                if self.board[r+1][c+1][0] == 'w':
-                    moves.append(Move((r, c), (r+1, c+1), self.board))
-                elif (r+1, c+1) == self.enPassantPossible:
-                    moves.append(Move((r, c), (r+1, c+1), self.board, isEnPassantMove=True))
+            allyColor, enemyColor, step, startRow = 'w', 'b', -1, 6
+        else:
+            allyColor, enemyColor, step, startRow = 'b', 'w', 1, 1
+        occupied = self.colorBitboards['w'] | self.colorBitboards['b']
+        
+        if not occupied & SQUARE_BB[sq + 8 * step]: # 1 square advance
+            moves.append(Move((r, c), (r + step, c), self.board))
+            if r == startRow and not occupied & SQUARE_BB[sq + 16 * step]: # 2 square advance
+                moves.append(Move((r, c), (r + 2 * step, c), self.board))
+        
+        attacks = PAWN_ATTACKS[allyColor][sq]
+        self._addTargets(r, c, attacks & self.colorBitboards[enemyColor], moves)
+        if self.enPassantPossible:
+            epRow, epCol = self.enPassantPossible
+            if attacks & SQUARE_BB[epRow * 8 + epCol]:
+                moves.append(Move((r, c), (epRow, epCol), self.board, isEnPassantMove=True))
 
     def getRookMoves(self, r, c, moves):
         """
         Sliding moves for Rooks.
         """
-        directions = ((-1, 0), (0, -1), (1, 0), (0, 1))
-        enemyColor = "b" if self.whiteToMove else "w"
-        for d in directions:
-            for i in range(1, 8):
-                endRow, endCol = r + d[0] * i, c + d[1] * i
-                if 0 <= endRow < 8 and 0 <= endCol < 8:
-                    endPiece = self.board[endRow][endCol]
-                    if endPiece == "--":
-                        moves.append(Move((r, c), (endRow, endCol), self.board))
-                    elif endPiece[0] == enemyColor:
-                        moves.append(Move((r, c), (endRow, endCol), self.board))
-                        break
-                    else: # Friendly piece
-                        break
-                else: # Off board
-                    break
+        allyColor = 'w' if self.whiteToMove else 'b'
+        occupied = self.colorBitboards['w'] | self.colorBitboards['b']
+        self._addTargets(r, c, rookAttacks(r * 8 + c, occupied) & ~self.colorBitboards[allyColor], moves)
 
     def getKnightMoves(self, r, c, moves):
         """
         Returns all pseudo-legal moves for the Knight.
         """
-        knightMoves = ((-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1))
-        allyColor = "w" if self.whiteToMove else "b"
-        for m in knightMoves:
-            endRow, endCol = r + m[0], c + m[1]
-            if 0 <= endRow < 8 and 0 <= endCol < 8:
-                if self.board[endRow][endCol][0] != allyColor:
-                    moves.append(Move((r, c), (endRow, endCol), self.board))
+        allyColor = 'w' if self.whiteToMove else 'b'
+        self._addTargets(r, c, KNIGHT_ATTACKS[r * 8 + c] & ~self.colorBitboards[allyColor], moves)
 
     def getBishopMoves(self, r, c, moves):
         """
         Sliding moves for Bishops along diagonals.
         """
-        directions = ((-1, -1), (-1, 1), (1, -1), (1, 1))
-        enemyColor = "b" if self.whiteToMove else "w"
-        for d in directions:
-            for i in range(1, 8):
-                endRow, endCol = r + d[0] * i, c + d[1] * i
-                if 0 <= endRow < 8 and 0 <= endCol < 8:
-                    endPiece = self.board[endRow][endCol]
-                    if endPiece == "--":
-                        moves.append(Move((r, c), (endRow, endCol), self.board))
-                    elif endPiece[0] == enemyColor:
-                        moves.append(Move((r, c), (endRow, endCol), self.board))
-                        break
-                    else: # Friendly piece
-                        break
-                else:
-                    break
+        allyColor = 'w' if self.whiteToMove else 'b'
+        occupied = self.colorBitboards['w'] | self.colorBitboards['b']
+        self._addTargets(r, c, bishopAttacks(r * 8 + c, occupied) & ~self.colorBitboards[allyColor], moves)
 
     def getQueenMoves(self, r, c, moves):
         """
@@ -416,31 +1005,8 @@ class GameState:
         """
         Returns all pseudo-legal moves for the King.
         """
-        kingMoves = ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1))
-        allyColor = "w" if self.whiteToMove else "b"
-        for m in kingMoves:
-            endRow, endCol = r + m[0], c + m[1]
-            if 0 <= endRow < 8 and 0 <= endCol < 8:
-                if self.board[endRow][endCol][0] != allyColor:
-                     moves.append(Move((r, c), (endRow, endCol), self.board))
-    
-    def getCastleMoves(self, r, c, moves):
-        if self.squareUnderAttack(r, c):
-            return # Can't castle in check
-        if (self.whiteToMove and self.currentCastlingRight.wks) or (not self.whiteToMove and self.currentCastlingRight.bks):
-            self.getKingsideCastleMoves(r, c, moves)
-        if (self.whiteToMove and self.currentCastlingRight.wqs) or (not self.whiteToMove and self.currentCastlingRight.bqs):
-            self.getQueensideCastleMoves(r, c, moves)
-        
-    def getKingsideCastleMoves(self, r, c, moves):
-        if self.board[r][c+1] == '--' and self.board[r][c+2] == '--':
-            if not self.squareUnderAttack(r, c+1) and not self.squareUnderAttack(r, c+2):
-                moves.append(Move((r, c), (r, c+2), self.board, isCastleMove=True))
-    
-    def getQueensideCastleMoves(self, r, c, moves):
-        if self.board[r][c-1] == '--' and self.board[r][c-2] == '--' and self.board[r][c-3] == '--':
-            if not self.squareUnderAttack(r, c-1) and not self.squareUnderAttack(r, c-2):
-                moves.append(Move((r, c), (r, c-2), self.board, isCastleMove=True))
+        allyColor = 'w' if self.whiteToMove else 'b'
+        self._addTargets(r, c, KING_ATTACKS[r * 8 + c] & ~self.colorBitboards[allyColor], moves)
     
 class CastleRights:
     """
@@ -452,10 +1018,52 @@ class CastleRights:
         self.wqs = wqs
         self.bqs = bqs
         
+class MoveCache:
+    """
+    Bounded least-recently-used map from a position's zobristKey to its legal moves.
+    Moves are stored as a tuple of packed ints, so nothing handed out can be changed
+    behind the cache's back: every caller builds its own list (or Move objects) from it.
+    """
+    def __init__(self, maxEntries=4096):
+        self.maxEntries = maxEntries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        codes = self.entries.get(key)
+        if codes is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return codes
+
+    def put(self, key, codes):
+        self.entries[key] = codes
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxEntries:
+            self.entries.popitem(last=False) # Evict the least recently used position
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def hitRate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
 class Move:
     """
     Represents a single move on the chess board including utility mappings for chess notation.
+    The move generator works on packed ints; a Move is only built (via fromCode) for moves
+    the UI or the move log actually needs.
     """
+    __slots__ = ('startRow', 'startCol', 'endRow', 'endCol', 'pieceMoved', 'pieceCaptured', 'promotionChoice',
+                 'isPawnPromotion', 'isEnPassantMove', 'isCastleMove', 'moveID')
+
     # Map chess notation to indices
     ranksToRows = {"1": 7, "2": 6, "3": 5, "4": 4, "5": 3, "6": 2, "7": 1, "8": 0}
     rowsToRanks = {v: k for k, v in ranksToRows.items()}
@@ -477,21 +1085,46 @@ class Move:
             self.pieceCaptured = 'wP' if self.pieceMoved == 'bP' else 'bP'
         self.isCastleMove = isCastleMove
 
-        # Unique ID for move comparison
-        self.moveID = self.startRow * 1000 + self.startCol * 100 + self.endRow * 10 + self.endCol
+        # Unique ID for move comparison (the start/end bits of the packed encoding, plus the
+        # promotion piece, so that each promotion is a move of its own)
+        self.moveID = (self.startRow * 8 + self.startCol) | (self.endRow * 8 + self.endCol) << 6
+        if self.isPawnPromotion:
+            self.moveID |= PROMOTION_CODES[promotionChoice] << 12
+
+    @classmethod
+    def fromCode(cls, code, board):
+        """
+        Builds a Move from a packed move int, reading the pieces from board.
+        """
+        startSq = code & 63
+        endSq = code >> 6 & 63
+        flags = code >> 12
+        return cls((startSq >> 3, startSq & 7), (endSq >> 3, endSq & 7), board,
+                   isEnPassantMove=flags == EN_PASSANT,
+                   isCastleMove=flags == KING_CASTLE or flags == QUEEN_CASTLE,
+                   promotionChoice=PROMOTION_PIECES[flags & 3] if flags & PROMOTION else 'Q')
 
     def __eq__(self, other):
         if isinstance(other, Move):
             return self.moveID == other.moveID
         return False
+
+    def __hash__(self):
+        return self.moveID
             
     def getChessNotation(self):
         """
         Converts move coordinates to chess algebraic notation (e.g., e2e4).
         """
         return self.getRankFile(self.startRow, self.startCol) + self.getRankFile(self.endRow, self.endCol)
+
+    def getUciNotation(self):
+        """
+        Long algebraic notation as used by UCI, with the promotion piece appended (e.g., e7e8q).
+        """
+        if self.isPawnPromotion:
+            return self.getChessNotation() + self.promotionChoice.lower()
+        return self.getChessNotation()
     
     def getRankFile(self, r, c):
         return self.colsToFiles[c] + self.rowsToRanks[r]
-    
-    
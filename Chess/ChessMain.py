@@ -1,8 +1,10 @@
 """Main driver file for displaying the game state."""
 
 import pygame as p
+import multiprocessing
 import sys
 import os
+from collections import OrderedDict
 
 def get_resource_path(relative_path):
     """ Get absolute path to resource, works for dev and for PyInstaller """
@@ -18,6 +20,8 @@ def get_resource_path(relative_path):
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from Chess import ChessEngine
+from Chess.ChessAI import CHECKMATE, MATE_THRESHOLD
+from Chess.EngineWorker import EngineWorker
 
 # Constants and Configuration
 BOARD_SIZE = 512
@@ -28,11 +32,22 @@ HEIGHT = BOARD_SIZE + BOARD_PADDING * 2
 DIMENSION = 8
 SQ_SIZE = BOARD_SIZE // DIMENSION
 MAX_FPS = 30
+MEDIA_FRAME_MS = 1500 # Time each media image stays on screen
+SHADOW_MARGIN = 6 # Deepest panel drop shadow (drawTactilePanel shadow_offset)
+BOARD_LAYER_ORIGIN = (BOARD_PADDING - 12, BOARD_PADDING - 12) # Top left of the board frame
+FONT_NAME = "Courier New"
+FONT_SPECS = [(10, True), (11, True), (12, False), (12, True), (14, False), (14, True), (16, True), (22, True)] # (size, bold) used by the UI
+TEXT_CACHE_SIZE = 512 # Rendered text surfaces kept (least recently used are dropped)
+STATUS_CACHE_SIZE = 32 # Composed status panels kept (turn messages, errors, engine lines)
 
 # Assets cache
 IMAGES = {}
 SOUNDS = {}
 MEDIA = [] 
+LAYERS = {} # Pre-rendered static surfaces (board per orientation, panel bezels, tinted icons)
+FONTS = {} # (size, bold) -> Font, looked up once by loadFonts
+TEXT_CACHE = OrderedDict() # (size, bold, text, color) -> rendered text Surface, in LRU order
+STATUS_CACHE = OrderedDict() # (message, color, engine status) -> composed status panel, in LRU order
 
 # Retro Color Palette
 COLORS = {
@@ -71,6 +86,32 @@ def loadSounds():
         except Exception as e:
             print(f"Audio loading warning: Missing {filename}")
 
+def loadFonts():
+    """
+    Looks up every UI font size once: SysFont scans the installed fonts on each call.
+    """
+    for size, bold in FONT_SPECS:
+        FONTS[(size, bold)] = p.font.SysFont(FONT_NAME, size, bold)
+
+def renderText(text, size, color, bold=False):
+    """
+    Antialiased text surface, rasterised once per (font, text, color) and then served from
+    an LRU cache, so labels, moves and status messages are just blitted.
+    """
+    key = (size, bold, text, color)
+    surface = TEXT_CACHE.get(key)
+    if surface is not None:
+        TEXT_CACHE.move_to_end(key)
+        return surface
+    font = FONTS.get((size, bold))
+    if font is None: # A size outside FONT_SPECS: look it up once too
+        font = FONTS[(size, bold)] = p.font.SysFont(FONT_NAME, size, bold)
+    surface = font.render(text, True, color)
+    TEXT_CACHE[key] = surface
+    if len(TEXT_CACHE) > TEXT_CACHE_SIZE:
+        TEXT_CACHE.popitem(last=False)
+    return surface
+
 def loadImages():
     """
     Loads piece images, icons, and applies scaling for consistent UI layout.
@@ -135,10 +176,19 @@ def main():
     screen = p.display.set_mode((WIDTH, HEIGHT))
     p.display.set_caption("Retro Chess - Tactical Interface")
     clock = p.time.Clock()
+    renderer = DirtyRectRenderer(screen)
+    loadFonts()
     
     gs = ChessEngine.GameState()
+    # Undo/redo/reset revisit positions seen moments ago: answer those from a shared cache
+    moveCache = gs.enableMoveCache(1024)
     validMoves = gs.getValidMoves()
     moveMade = False # Flag for when a move is made to recalculate valid moves
+
+    # The engine analyses every position in a separate process; the loop only posts and polls
+    engine = EngineWorker()
+    engine.post(gs)
+    engine_line = None # Last analysis shown under the status message
     
     loadImages()
     loadSounds()
@@ -147,7 +197,9 @@ def main():
     playerClicks = [] # Track player clicks (start and end squares)
     
     # State tracking
-    move_log_scroll_offset = 0 # Track scroll position for move log
+    log_region = regionRects()["moveLog"]
+    move_log_rect = p.Rect(log_region.topleft, (log_region.width - SHADOW_MARGIN, log_region.height - SHADOW_MARGIN))
+    move_log = MoveLogView(move_log_rect) # Rows and scroll position of the move log panel
     undone_moves = []
     sound_enabled = True
     board_locked_to = None # None means auto-rotate, True means locked to White, False means locked to Black
@@ -181,23 +233,21 @@ def main():
     running = True
     while running:
         board_rect = p.Rect(BOARD_PADDING, BOARD_PADDING, BOARD_SIZE, BOARD_SIZE)
-        
-        # Calculate panel bounds for scrolling check
-        move_log_panel_y = BOARD_PADDING - 12
-        right_side_bottom = (BOARD_PADDING + BOARD_SIZE + 12)
-        panel_height = (right_side_bottom - move_log_panel_y) - 65 - 50 - 150 - (3 * 15)
-        move_log_rect = p.Rect(BOARD_SIZE + (BOARD_PADDING * 2), move_log_panel_y, MOVE_LOG_WIDTH, panel_height)
 
         for e in p.event.get():
             if e.type == p.QUIT:
                 running = False
+
+            # The window was uncovered or restored: everything has to be pushed again
+            elif e.type in (p.WINDOWEXPOSED, p.WINDOWRESTORED, p.VIDEOEXPOSE):
+                renderer.invalidateAll()
             
             # Mouse wheel scrolling for move log
             elif e.type == p.MOUSEWHEEL:
                 mouse_pos = p.mouse.get_pos()
                 if move_log_rect.collidepoint(mouse_pos):
                     # -e.y because scrolling down returns negative, but we want to increase offset
-                    move_log_scroll_offset += -e.y 
+                    move_log.scroll(-e.y)
                     
             # Mouse click handling
             elif e.type == p.MOUSEBUTTONDOWN:
@@ -234,7 +284,10 @@ def main():
                                     current_message = "White to Move" if gs.whiteToMove else "Black to Move"
                         elif action == "reset":
                             gs = ChessEngine.GameState()
+                            gs.enableMoveCache(cache=moveCache)
                             validMoves = gs.getValidMoves()
+                            engine.post(gs)
+                            engine_line = None
                             sqSelected = ()
                             playerClicks = []
                             moveMade = False
@@ -260,7 +313,9 @@ def main():
                 message_timer = p.time.get_ticks()
                 
                 # Board Clicks
-                if e.type == p.MOUSEBUTTONDOWN and board_rect.collidepoint(location):
+                # (a drawn game stays frozen until Undo or Reset, like a finished one)
+                if e.type == p.MOUSEBUTTONDOWN and board_rect.collidepoint(location) and \
+                        not (gs.repetitionDraw or gs.fiftyMoveDraw):
                     visual_bottom_is_white = gs.whiteToMove if board_locked_to is None else board_locked_to
                     
                     col = (location[0] - BOARD_PADDING) // SQ_SIZE
@@ -299,19 +354,18 @@ def main():
                                     # Intercept Pawn Promotion to ask user for choice
                                     if validMoves[i].isPawnPromotion:
                                         piece_choice = showPromotionDialog(screen, gs.whiteToMove)
-                                        validMoves[i].promotionChoice = piece_choice
+                                        renderer.invalidateAll() # The dialog drew over every panel
+                                        # Each promotion piece is a move of its own: play the one picked
+                                        move = ChessEngine.Move(playerClicks[0], playerClicks[1], gs.board, promotionChoice=piece_choice)
+                                        i = validMoves.index(move)
                                         
                                     gs.makeMove(validMoves[i])
                                     moveMade = True
                                     undone_moves.clear() # Clear redo stack on new move
                                     
                                     # Snap scroll to bottom when a new move is made
-                                    total_rows = (len(gs.moveLog) + 1) // 2
-                                    max_visible_float = (move_log_rect.height - 70) / 22
-                                    max_visible = max(1, int(max_visible_float))
-                                    if total_rows > max_visible:
-                                        # Force scroll offset to the max possible value
-                                        move_log_scroll_offset = max(0, total_rows - max_visible)
+                                    move_log.sync(gs)
+                                    move_log.scrollToEnd()
                                     
                                     # Play appropriate sound based on game state
                                     if gs.inCheck(): 
@@ -361,6 +415,20 @@ def main():
         if moveMade:
             validMoves = gs.getValidMoves()
             moveMade = False
+            if validMoves and not (gs.repetitionDraw or gs.fiftyMoveDraw):
+                engine.post(gs)
+            else:
+                engine.cancel() # Game over: nothing to analyse
+            engine_line = None
+
+        # Pick up the engine's answer without waiting for it
+        response = engine.poll()
+        if response is not None:
+            engine_line = formatEngineLine(response.result)
+        if engine.thinking:
+            engine_status = "Thinking" + "." * (p.time.get_ticks() // 400 % 4)
+        else:
+            engine_status = engine_line
     
         # Handle transient messages
         if p.time.get_ticks() - message_timer > 1500: # 1.5 seconds
@@ -368,27 +436,115 @@ def main():
                 current_message = "Checkmate! " + ('Black' if gs.whiteToMove else 'White') + " Wins"
             elif gs.staleMate:
                 current_message = "Stalemate"
+            elif gs.repetitionDraw:
+                current_message = "Draw: Threefold Repetition"
+            elif gs.fiftyMoveDraw:
+                current_message = "Draw: Fifty-Move Rule"
             else:
                 current_message = "White to Move" if gs.whiteToMove else "Black to Move"
         
-        # Rendering
-        drawGameState(screen, gs, validMoves, sqSelected, buttons, sound_enabled, current_message, board_locked_to, move_log_scroll_offset)
-        
-        # Optional: Tactile popup for end game
-        if gs.checkMate or gs.staleMate:
-            drawEndGamePopup(screen, gs)
+        # Rendering: only the panels whose state changed are redrawn and pushed to the display
+        drawGameState(renderer, gs, validMoves, sqSelected, buttons, sound_enabled, current_message, board_locked_to, move_log, engine_status)
 
         clock.tick(MAX_FPS)
-        p.display.flip()
 
+    engine.close()
 
 
+def formatEngineLine(result):
+    """
+    One-line summary of a SearchResult for the status dialog, e.g. "Engine: g1f3 +0.35".
+    """
+    if result is None:
+        return None # No legal moves: the game end message says it all
+    score = result.score
+    if score >= MATE_THRESHOLD:
+        evaluation = f"#{(CHECKMATE - score + 1) // 2}"
+    elif score <= -MATE_THRESHOLD:
+        evaluation = f"#-{(CHECKMATE + score) // 2}"
+    else:
+        evaluation = f"{score / 100:+.2f}"
+    return f"Engine: {ChessEngine.moveCodeToUci(result.bestMove)} {evaluation}"
+
+
+def regionRects():
+    """
+    Screen area owned by each panel, drop shadow included. Panels don't overlap, so any
+    one of them can be cleared and redrawn on its own.
+    """
+    right_x = BOARD_SIZE + BOARD_PADDING * 2
+    right_side_bottom = BOARD_PADDING + BOARD_SIZE + 12
+    control_y = right_side_bottom - 65
+    status_y = control_y - 15 - 50
+    media_y = status_y - 15 - 150
+    log_y = BOARD_PADDING - 12
+    return {
+        "board": p.Rect(BOARD_PADDING - 12, BOARD_PADDING - 12, BOARD_SIZE + 24 + SHADOW_MARGIN, BOARD_SIZE + 24 + SHADOW_MARGIN),
+        "moveLog": p.Rect(right_x, log_y, MOVE_LOG_WIDTH + SHADOW_MARGIN, media_y - 15 - log_y + SHADOW_MARGIN),
+        "media": p.Rect(right_x, media_y, MOVE_LOG_WIDTH + SHADOW_MARGIN, 150 + SHADOW_MARGIN),
+        "status": p.Rect(right_x, status_y, MOVE_LOG_WIDTH + SHADOW_MARGIN, 50 + SHADOW_MARGIN),
+        "controls": p.Rect(right_x, control_y, MOVE_LOG_WIDTH + SHADOW_MARGIN, 65 + SHADOW_MARGIN),
+    }
+
+class DirtyRectRenderer:
+    """
+    Retained-mode drawing: each panel remembers the state it was last drawn with and is
+    only cleared and redrawn when that state changes. Only the redrawn areas are pushed
+    with display.update, so an idle frame draws and uploads nothing.
+    """
+    def __init__(self, screen):
+        self.screen = screen
+        self.regions = regionRects()
+        self.drawnState = {}
+        self.fullFrame = True
+
+    def invalidate(self, name):
+        self.drawnState.pop(name, None)
+
+    def invalidateAll(self):
+        """
+        Forces a full redraw and flip on the next frame (start-up, dialogs, window exposed).
+        """
+        self.drawnState.clear()
+        self.fullFrame = True
+
+    def render(self, panels):
+        """
+        panels maps a region name to (state, draw function). Returns the rects updated.
+        """
+        if self.fullFrame:
+            self.screen.fill(COLORS["bg"])
+        dirty = []
+        for name, (state, draw) in panels.items():
+            if name in self.drawnState and self.drawnState[name] == state:
+                continue
+            rect = self.regions[name]
+            self.screen.fill(COLORS["bg"], rect)
+            draw()
+            self.drawnState[name] = state
+            dirty.append(rect)
+        if self.fullFrame:
+            p.display.flip()
+            self.fullFrame = False
+        elif dirty:
+            p.display.update(dirty)
+        return dirty
+
 def drawTactilePanel(screen, rect, border_color, bg_color, shadow_offset=4, border_radius=8):
-    """Draws a panel with a tactile shadow effect."""
-    shadow_rect = rect.move(shadow_offset, shadow_offset)
-    p.draw.rect(screen, COLORS["shadow"], shadow_rect, border_radius=border_radius)
-    p.draw.rect(screen, bg_color, rect, border_radius=border_radius)
-    p.draw.rect(screen, border_color, rect, 2, border_radius=border_radius)
+    """
+    Draws a panel with a tactile shadow effect. Every distinct panel (size, colors, shadow,
+    radius) is stroked once into a layer and blitted from then on.
+    """
+    key = ("panel", rect.size, border_color, bg_color, shadow_offset, border_radius)
+    layer = LAYERS.get(key)
+    if layer is None:
+        layer = p.Surface((rect.width + shadow_offset, rect.height + shadow_offset), p.SRCALPHA)
+        panel_rect = p.Rect(0, 0, rect.width, rect.height)
+        p.draw.rect(layer, COLORS["shadow"], panel_rect.move(shadow_offset, shadow_offset), border_radius=border_radius)
+        p.draw.rect(layer, bg_color, panel_rect, border_radius=border_radius)
+        p.draw.rect(layer, border_color, panel_rect, 2, border_radius=border_radius)
+        LAYERS[key] = layer
+    screen.blit(layer, rect.topleft)
 
 def drawControls(screen, buttons, sound_enabled, board_locked_to):
     """Renders the bottom control bar with tactile buttons and icons."""
@@ -411,129 +567,123 @@ def drawControls(screen, buttons, sound_enabled, board_locked_to):
             
         # Draw the icon if it loaded successfully
         if icon_key in IMAGES:
-            icon = IMAGES[icon_key]
-            # Custom coloration for these specific icons (turning them dark brown)
-            # This ensures they fit the palette regardless of their original PNG color
-            color_surface = p.Surface(icon.get_size()).convert_alpha()
-            color_surface.fill(COLORS["dark"])
-            icon_copy = icon.copy()
-            icon_copy.blit(color_surface, (0,0), special_flags=p.BLEND_RGBA_MULT)
+            icon = LAYERS.get(("icon", icon_key))
+            if icon is None:
+                # Custom coloration for these specific icons (turning them dark brown)
+                # This ensures they fit the palette regardless of their original PNG color
+                color_surface = p.Surface(IMAGES[icon_key].get_size()).convert_alpha()
+                color_surface.fill(COLORS["dark"])
+                icon = IMAGES[icon_key].copy()
+                icon.blit(color_surface, (0,0), special_flags=p.BLEND_RGBA_MULT)
+                LAYERS[("icon", icon_key)] = icon
             
-            screen.blit(icon_copy, (rect.centerx - icon.get_width() // 2, rect.centery - icon.get_height() // 2))
+            screen.blit(icon, (rect.centerx - icon.get_width() // 2, rect.centery - icon.get_height() // 2))
 
-def drawMoveLog(screen, gs):
+class MoveLogView:
+    """
+    View model of the move log panel: the moves mirrored from gs.moveLog, one cached row
+    surface per turn and the scroll position. sync() only touches the end of the log that
+    changed and drawing blits the visible rows, so long games cost O(visible rows) per frame.
+    """
+    LINE_SPACING = 22
+    ROWS_TOP = 65 # Below the header and column titles
+
+    def __init__(self, rect):
+        self.rect = rect # Panel rect (without its shadow)
+        self.maxVisible = max(1, (rect.height - 70) // self.LINE_SPACING)
+        self.moves = [] # Same Move objects as gs.moveLog, up to the last sync
+        self.rows = [] # Rendered row surface per turn, None until first drawn
+        self.scrollOffset = 0 # First visible row
+        self.version = 0 # Bumped on every visible change (dirty-rect key)
+
+    def sync(self, gs):
+        """
+        Follows makeMove/undoMove on gs (or a new game) by popping the moves that are gone
+        and appending the new ones. Returns True if the log changed.
+        """
+        log = gs.moveLog
+        moves = self.moves
+        if len(moves) == len(log) and (not moves or moves[-1] is log[-1]):
+            return False
+        # Moves only come and go at the end: drop ours until they are a prefix of the log
+        while moves and (len(moves) > len(log) or moves[-1] is not log[len(moves) - 1]):
+            moves.pop()
+        del self.rows[len(moves) // 2:] # A half-filled row has to be rendered again
+        moves.extend(log[len(moves):])
+        self.rows.extend([None] * (self.rowCount() - len(self.rows)))
+        self.scrollOffset = min(self.scrollOffset, self.maxScroll())
+        self.version += 1
+        return True
+
+    def rowCount(self):
+        return (len(self.moves) + 1) // 2
+
+    def maxScroll(self):
+        return max(0, self.rowCount() - self.maxVisible)
+
+    def scroll(self, rows):
+        offset = min(max(0, self.scrollOffset + rows), self.maxScroll())
+        if offset != self.scrollOffset:
+            self.scrollOffset = offset
+            self.version += 1
+
+    def scrollToEnd(self):
+        self.scroll(self.maxScroll() - self.scrollOffset)
+
+    def rowSurface(self, i):
+        """
+        Turn number, White's and Black's move of row i, rendered on first use.
+        """
+        surface = self.rows[i]
+        if surface is None:
+            surface = p.Surface((self.rect.width - 20, self.LINE_SPACING), p.SRCALPHA)
+            surface.blit(renderText(str(i + 1) + ".", 14, COLORS["brown"]), (15, 0))
+            surface.blit(renderText(self.moves[2 * i].getChessNotation(), 14, COLORS["dark"]), (60, 0))
+            if 2 * i + 1 < len(self.moves):
+                surface.blit(renderText(self.moves[2 * i + 1].getChessNotation(), 14, COLORS["dark"]), (150, 0))
+            self.rows[i] = surface
+        return surface
+
+def drawMoveLog(screen, view):
     """
     Renders the right sidebar containing the move log in a two-column format.
     """
-    control_panel_height = 65
-    gap_between_panels = 15
-    
-    # We will need space for Status (e.g. 50px) and Media (e.g. 150px) below this
-    status_height = 50
-    media_height = 150
-    
-    # Calculate panel bounds
-    panel_y = BOARD_PADDING - 12
-    # The bottom of the entirity of right-side panels
-    right_side_bottom = (BOARD_PADDING + BOARD_SIZE + 12)
-    
-    # Calculate how much space is left for the Move Log
-    # Total space = (bottom - top) - control_panel - gaps - status - media
-    panel_height = (right_side_bottom - panel_y) - control_panel_height - status_height - media_height - (3 * gap_between_panels)
-    
-    panel_rect = p.Rect(BOARD_SIZE + (BOARD_PADDING * 2), panel_y, MOVE_LOG_WIDTH, panel_height)
-    # Using the same styling as the board frame: COLORS["dark"] border, COLORS["panel"] inside, shadow_offset=6
-    drawTactilePanel(screen, panel_rect, COLORS["dark"], COLORS["panel"], shadow_offset=6)
-    
-    # Render Sidebar Header & Column Titles
-    font = p.font.SysFont("Courier New", 16, True)
-    text = font.render("MOVES", True, COLORS["dark"])
-    screen.blit(text, (panel_rect.centerx - text.get_width() // 2, panel_rect.y + 12))
-    
-    # Column Subheaders
-    font_sub = p.font.SysFont("Courier New", 12, True)
-    white_header = font_sub.render("White", True, COLORS["brown"])
-    black_header = font_sub.render("Black", True, COLORS["brown"])
-    
-    # Column X coordinates
-    num_x = panel_rect.x + 15
-    white_x = panel_rect.x + 60
-    black_x = panel_rect.x + 150
-    
-    screen.blit(white_header, (white_x, panel_rect.y + 40))
-    screen.blit(black_header, (black_x, panel_rect.y + 40))
-    
-    # Draw a subtle separator line
-    p.draw.line(screen, COLORS["shadow"], (panel_rect.x + 10, panel_rect.y + 58), (panel_rect.x + MOVE_LOG_WIDTH - 10, panel_rect.y + 58), 1)
-
-    # Process move log for two-column display
-    moveLog = gs.moveLog
-    moveRows = []
-    for i in range(0, len(moveLog), 2):
-        turn_string = str(i // 2 + 1) + "."
-        white_string = str(moveLog[i].getChessNotation())
-        black_string = str(moveLog[i + 1].getChessNotation()) if i + 1 < len(moveLog) else ""
-        moveRows.append((turn_string, white_string, black_string))
-        
-    font_moves = p.font.SysFont("Courier New", 14)
-    line_spacing = 22
-    start_y = panel_rect.y + 65
-    
-    # Auto-scrolling logic combined with manual scroll offset
-    max_visible_float = (panel_rect.height - 70) / line_spacing
-    max_visible = max(1, int(max_visible_float))
-    
-    total_rows = len(moveRows)
-    max_scroll = max(0, total_rows - max_visible)
-    
-    # We must receive the scroll offset from the main scope 
-    # Because drawMoveLog is called from drawGameState, we'll need to fetch it or pass it.
-    # To avoid changing all signatures across the app, we can cheat slightly by modifying
-    # the dictionary, but passing it through drawGameState is cleaner.
-    
-    # We handle the scroll validation here:
-    global move_log_saved_offset
-    # Read kwargs from where we modified drawGameState
-    scroll_offset = gs.ui_scroll_offset if hasattr(gs, 'ui_scroll_offset') else 0
-
-    # Clamp scroll offset between 0 and max_scroll
-    if scroll_offset < 0:
-        scroll_offset = 0
-    elif scroll_offset > max_scroll:
-        scroll_offset = max_scroll
-        
-    start_idx = scroll_offset
-    
-    # Write it back if we clamped it so wheel feels responsive
-    if hasattr(gs, 'ui_scroll_offset'):
-        gs.ui_scroll_offset = scroll_offset
-    
-    for i in range(start_idx, len(moveRows)):
-        row_idx = i - start_idx
-        y_pos = start_y + (row_idx * line_spacing)
-        
-        # Prevent drawing outside the bottom of the panel
-        if y_pos + line_spacing > panel_rect.bottom:
-            break
-        
-        turn_num, white_mv, black_mv = moveRows[i]
-        
-        # Turn Number
-        text_num = font_moves.render(turn_num, True, COLORS["brown"])
-        screen.blit(text_num, (num_x, y_pos))
-        
-        # White Move
-        text_white = font_moves.render(white_mv, True, COLORS["dark"])
-        screen.blit(text_white, (white_x, y_pos))
-        
-        # Black Move
-        if black_mv != "":
-            text_black = font_moves.render(black_mv, True, COLORS["dark"])
-            screen.blit(text_black, (black_x, y_pos))
+    panel_rect = view.rect
+
+    # Panel, header, column titles and separator never change: one pre-rendered layer
+    key = ("moveLog", panel_rect.size)
+    layer = LAYERS.get(key)
+    if layer is None:
+        layer = p.Surface((panel_rect.width + 6, panel_rect.height + 6), p.SRCALPHA)
+        local_rect = p.Rect(0, 0, panel_rect.width, panel_rect.height)
+        # Using the same styling as the board frame: COLORS["dark"] border, COLORS["panel"] inside, shadow_offset=6
+        drawTactilePanel(layer, local_rect, COLORS["dark"], COLORS["panel"], shadow_offset=6)
+
+        # Render Sidebar Header & Column Titles
+        text = renderText("MOVES", 16, COLORS["dark"], bold=True)
+        layer.blit(text, (local_rect.centerx - text.get_width() // 2, 12))
+
+        # Column Subheaders
+        white_header = renderText("White", 12, COLORS["brown"], bold=True)
+        black_header = renderText("Black", 12, COLORS["brown"], bold=True)
+        layer.blit(white_header, (60, 40))
+        layer.blit(black_header, (150, 40))
+
+        # Draw a subtle separator line
+        p.draw.line(layer, COLORS["shadow"], (10, 58), (MOVE_LOG_WIDTH - 10, 58), 1)
+        LAYERS[key] = layer
+    screen.blit(layer, panel_rect.topleft)
+
+    # Only the visible window of rows is blitted
+    start_y = panel_rect.y + view.ROWS_TOP
+    first = view.scrollOffset
+    for i in range(first, min(view.rowCount(), first + view.maxVisible)):
+        screen.blit(view.rowSurface(i), (panel_rect.x, start_y + (i - first) * view.LINE_SPACING))
 
     # Scrollbar
     # Calculate scrollbar height based on how many items fit compared to total
-    total_items = len(moveRows)
+    total_items = view.rowCount()
+    max_visible = view.maxVisible
     if total_items > max_visible:
         scrollbar_width = 6
         scrollbar_x = panel_rect.right - 12
@@ -543,7 +693,8 @@ def drawMoveLog(screen, gs):
         # Calculate knob size and position
         knob_height = max(15, int((max_visible / total_items) * scrollbar_max_height))
         # proportion of how far down we are scrolled
-        scroll_ratio = start_idx / max_scroll if max_scroll > 0 else 0
+        max_scroll = view.maxScroll()
+        scroll_ratio = first / max_scroll if max_scroll > 0 else 0
         knob_y = scrollbar_y_start + (scrollbar_max_height - knob_height) * scroll_ratio
         
         # Draw track
@@ -572,31 +723,44 @@ def highlightSquares(screen, gs, validMoves, sqSelected, board_locked_to):
             s.fill(p.Color('blue'))
             screen.blit(s, (BOARD_PADDING + visual_c * SQ_SIZE + 2, BOARD_PADDING + visual_r * SQ_SIZE + 2))
             
-            # Highlight valid move target squares
+            # Highlight valid move target squares, once each (a promotion square has four moves)
             s.fill(p.Color('yellow'))
-            for move in validMoves:
-                if move.startRow == r and move.startCol == c:
-                    move_visual_r = move.endRow if visual_bottom_is_white else 7 - move.endRow
-                    move_visual_c = move.endCol if visual_bottom_is_white else 7 - move.endCol
-                    screen.blit(s, (BOARD_PADDING + move_visual_c * SQ_SIZE + 2, BOARD_PADDING + move_visual_r * SQ_SIZE + 2))
+            targets = {(move.endRow, move.endCol) for move in validMoves if move.startRow == r and move.startCol == c}
+            for endRow, endCol in targets:
+                move_visual_r = endRow if visual_bottom_is_white else 7 - endRow
+                move_visual_c = endCol if visual_bottom_is_white else 7 - endCol
+                screen.blit(s, (BOARD_PADDING + move_visual_c * SQ_SIZE + 2, BOARD_PADDING + move_visual_r * SQ_SIZE + 2))
 
-def drawGameState(screen, gs, validMoves, sqSelected, buttons, sound_enabled, current_message, board_locked_to, scroll_offset=0):
-    """Draw the current game state."""
-    screen.fill(COLORS["bg"])
-    drawControls(screen, buttons, sound_enabled, board_locked_to)
-    
-    gs.ui_scroll_offset = scroll_offset # Store it temporarily in gs for drawMoveLog to access
-    drawMoveLog(screen, gs)
-    drawStatusDialog(screen, current_message)
-    drawMediaWindow(screen)
-    
-    drawBoard(screen, sqSelected, gs.whiteToMove, board_locked_to)
-    highlightSquares(screen, gs, validMoves, sqSelected, board_locked_to)
-    drawPieces(screen, gs.board, sqSelected, gs.whiteToMove, board_locked_to)
+def drawGameState(renderer, gs, validMoves, sqSelected, buttons, sound_enabled, current_message, board_locked_to, move_log, engine_status=None):
+    """
+    Draw the current game state through renderer. Each panel is keyed by the state it
+    shows, so only the panels whose state changed since the last frame are redrawn.
+    """
+    screen = renderer.screen
+    move_log.sync(gs) # Picks up undo, redo and reset; cheap when nothing changed
+    visual_bottom_is_white = gs.whiteToMove if board_locked_to is None else board_locked_to
+    game_over = (gs.checkMate, gs.staleMate, gs.repetitionDraw, gs.fiftyMoveDraw)
+
+    def drawBoardPanel():
+        drawBoard(screen, sqSelected, gs.whiteToMove, board_locked_to)
+        highlightSquares(screen, gs, validMoves, sqSelected, board_locked_to)
+        drawPieces(screen, gs.board, sqSelected, gs.whiteToMove, board_locked_to)
+        # Tactile popup for end game
+        drawEndGamePopup(screen, gs)
+
+    renderer.render({
+        "controls": ((sound_enabled, board_locked_to is not None),
+                     lambda: drawControls(screen, buttons, sound_enabled, board_locked_to)),
+        "moveLog": (move_log.version, lambda: drawMoveLog(screen, move_log)),
+        "status": ((current_message, engine_status), lambda: drawStatusDialog(screen, current_message, engine_status)),
+        "media": ((p.time.get_ticks() // MEDIA_FRAME_MS) % len(MEDIA) if MEDIA else None, lambda: drawMediaWindow(screen)),
+        "board": ((gs.zobristKey, sqSelected, visual_bottom_is_white, game_over), drawBoardPanel),
+    })
     
-def drawStatusDialog(screen, current_message):
+def drawStatusDialog(screen, current_message, engine_status=None):
     """
     Renders the quick-feedback status dialog with a CRT monitor aesthetic.
+    engine_status ("Thinking..." or the engine's last analysis) goes on a second line.
     """
     control_panel_height = 65
     gap_between_panels = 15
@@ -611,34 +775,68 @@ def drawStatusDialog(screen, current_message):
     
     panel_rect = p.Rect(BOARD_SIZE + (BOARD_PADDING * 2), status_y, MOVE_LOG_WIDTH, status_height)
     
+    # Phosphor Colors
+    text_color = COLORS["dark"] # Dark
+    if "Invalid" in current_message or "Illegal" in current_message:
+        text_color = COLORS["terra"] # Red/Orange for errors
+    elif "Checkmate" in current_message or "Check!" in current_message or "Draw" in current_message:
+        text_color = COLORS["brown"] # Amber/Brown
+
+    # The whole panel is composed once per message and reused until the message changes
+    key = (current_message, text_color, engine_status)
+    panel = STATUS_CACHE.get(key)
+    if panel is None:
+        panel = composeStatusPanel(panel_rect.size, current_message, text_color, engine_status)
+        STATUS_CACHE[key] = panel
+        if len(STATUS_CACHE) > STATUS_CACHE_SIZE:
+            STATUS_CACHE.popitem(last=False)
+    else:
+        STATUS_CACHE.move_to_end(key)
+    screen.blit(panel, panel_rect.topleft)
+
+def composeStatusPanel(size, current_message, text_color, engine_status):
+    """
+    Bezel, CRT screen, message lines and scanlines on one surface (shadow included).
+    """
+    panel = p.Surface((size[0] + 6, size[1] + 6), p.SRCALPHA)
+    panel_rect = p.Rect((0, 0), size)
+
     # Outer Bezel (Tactile panel)
-    drawTactilePanel(screen, panel_rect, COLORS["dark"], COLORS["panel"], shadow_offset=6)
+    drawTactilePanel(panel, panel_rect, COLORS["dark"], COLORS["panel"], shadow_offset=6)
     
     # Inner CRT Screen
     crt_rect = panel_rect.inflate(-12, -12)
-    p.draw.rect(screen, COLORS["bg"], crt_rect, border_radius=4) # Earthy background
+    p.draw.rect(panel, COLORS["bg"], crt_rect, border_radius=4) # Earthy background
     
     # Inset Shadow for CRT Screen
-    p.draw.rect(screen, COLORS["shadow"], crt_rect, width=2, border_radius=4)
-    p.draw.rect(screen, COLORS["dark"], crt_rect.inflate(-4, -4), width=1, border_radius=3)
-    
-    font = p.font.SysFont("Courier New", 14, True)
-    
-    # Phosphor Colors
-    text_color = COLORS["dark"] # Dark
-    if "Invalid" in current_message or "Illegal" in current_message:
-        text_color = COLORS["terra"] # Red/Orange for errors
-    elif "Checkmate" in current_message or "Check!" in current_message:
-        text_color = COLORS["brown"] # Amber/Brown
+    p.draw.rect(panel, COLORS["shadow"], crt_rect, width=2, border_radius=4)
+    p.draw.rect(panel, COLORS["dark"], crt_rect.inflate(-4, -4), width=1, border_radius=3)
         
-    text = font.render(current_message, True, text_color)
-    screen.blit(text, (crt_rect.centerx - text.get_width() // 2, crt_rect.centery - text.get_height() // 2))
+    text = renderText(current_message, 14, text_color, bold=True)
+    if engine_status:
+        engine_text = renderText(engine_status, 11, COLORS["brown"], bold=True)
+        top = crt_rect.centery - (text.get_height() + engine_text.get_height()) // 2
+        panel.blit(text, (crt_rect.centerx - text.get_width() // 2, top))
+        panel.blit(engine_text, (crt_rect.centerx - engine_text.get_width() // 2, top + text.get_height()))
+    else:
+        panel.blit(text, (crt_rect.centerx - text.get_width() // 2, crt_rect.centery - text.get_height() // 2))
     
     # CRT Scanlines
-    scanline_surf = p.Surface((crt_rect.width, crt_rect.height), p.SRCALPHA)
-    for y in range(0, crt_rect.height, 2):
-        p.draw.line(scanline_surf, (0, 0, 0, 80), (0, y), (crt_rect.width, y))
-    screen.blit(scanline_surf, crt_rect.topleft)
+    panel.blit(getScanlineOverlay(crt_rect.size), crt_rect.topleft)
+    return panel
+
+def getScanlineOverlay(size):
+    """
+    Translucent line on every other row, drawn once per CRT size.
+    """
+    key = ("scanlines", size)
+    scanline_surf = LAYERS.get(key)
+    if scanline_surf is None:
+        scanline_surf = p.Surface(size, p.SRCALPHA)
+        for y in range(0, size[1], 2):
+            p.draw.line(scanline_surf, (0, 0, 0, 80), (0, y), (size[0], y))
+        LAYERS[key] = scanline_surf
+    return scanline_surf
 
 def drawMediaWindow(screen):
     """
@@ -659,23 +857,32 @@ def drawMediaWindow(screen):
     media_y = status_y - gap_between_panels - media_height
     
     panel_rect = p.Rect(BOARD_SIZE + (BOARD_PADDING * 2), media_y, MOVE_LOG_WIDTH, media_height)
-    # Using the same styling as the board frame border
-    drawTactilePanel(screen, panel_rect, COLORS["dark"], COLORS["panel"], shadow_offset=6)
     
     # Internal media rect size
     inner_rect = panel_rect.inflate(-16, -16)
-    
-    # Draw depressed panel background
-    p.draw.rect(screen, COLORS["shadow"], inner_rect.move(1, 1), border_radius=8) # Highlight
-    p.draw.rect(screen, COLORS["dark"], inner_rect.move(-1, -1), border_radius=8) # Shadow
-    p.draw.rect(screen, COLORS["bg"], inner_rect, border_radius=8) # Deep bg
+
+    # Bezel and depressed background are static: one pre-rendered layer
+    key = ("media", panel_rect.size)
+    layer = LAYERS.get(key)
+    if layer is None:
+        layer = p.Surface((panel_rect.width + 6, panel_rect.height + 6), p.SRCALPHA)
+        local_rect = p.Rect(0, 0, panel_rect.width, panel_rect.height)
+        # Using the same styling as the board frame border
+        drawTactilePanel(layer, local_rect, COLORS["dark"], COLORS["panel"], shadow_offset=6)
+
+        # Draw depressed panel background
+        local_inner = local_rect.inflate(-16, -16)
+        p.draw.rect(layer, COLORS["shadow"], local_inner.move(1, 1), border_radius=8) # Highlight
+        p.draw.rect(layer, COLORS["dark"], local_inner.move(-1, -1), border_radius=8) # Shadow
+        p.draw.rect(layer, COLORS["bg"], local_inner, border_radius=8) # Deep bg
+        LAYERS[key] = layer
+    screen.blit(layer, panel_rect.topleft)
     
     # Render Media if available
     if len(MEDIA) > 0:
-        # Loop through images every 750ms
+        # Loop through images every MEDIA_FRAME_MS
         current_time = p.time.get_ticks()
-        frame_duration = 1500 # (ms) 
-        frame_idx = (current_time // frame_duration) % len(MEDIA)
+        frame_idx = (current_time // MEDIA_FRAME_MS) % len(MEDIA)
         img = MEDIA[frame_idx]
         
         img_rect = img.get_rect(center=inner_rect.center)
@@ -689,48 +896,71 @@ def drawMediaWindow(screen):
         p.draw.rect(screen, COLORS["dark"], img_rect.inflate(-2, -2), width=1, border_radius=8) # extra depth
     else:
         # Placeholder text if no media found
-        font = p.font.SysFont("Courier New", 12)
-        text = font.render("No Media Art Found", True, COLORS["shadow"])
+        text = renderText("No Media Art Found", 12, COLORS["shadow"])
         screen.blit(text, (panel_rect.centerx - text.get_width() // 2, panel_rect.centery - text.get_height() // 2))
 
 def drawBoard(screen, sqSelected, whiteToMove, board_locked_to):
-    """Draw the chessboard with retro colors and tactile tiles."""
-    # Draw the board's wooden/brown outer framing
-    board_frame = p.Rect(BOARD_PADDING - 12, BOARD_PADDING - 12, BOARD_SIZE + 24, BOARD_SIZE + 24)
-    drawTactilePanel(screen, board_frame, COLORS["dark"], COLORS["brown"], shadow_offset=6)
-
+    """
+    Draw the chessboard with retro colors and tactile tiles: the frame and the raised tiles
+    come pre-rendered (one layer per orientation), only the selected tile is drawn on top.
+    """
     visual_bottom_is_white = whiteToMove if board_locked_to is None else board_locked_to
+    screen.blit(getBoardLayer(visual_bottom_is_white), BOARD_LAYER_ORIGIN)
 
+    if sqSelected != ():
+        r, c = sqSelected
+        visual_r = r if visual_bottom_is_white else 7 - r
+        visual_c = c if visual_bottom_is_white else 7 - c
+        # Clear the raised tile back to the frame color before drawing it depressed
+        screen.fill(COLORS["brown"], (BOARD_PADDING + visual_c * SQ_SIZE, BOARD_PADDING + visual_r * SQ_SIZE, SQ_SIZE, SQ_SIZE))
+        drawTile(screen, r, c, visual_bottom_is_white, True)
+
+def getBoardLayer(visual_bottom_is_white):
+    """
+    The board frame with all 64 raised tiles and their coordinates, rendered once per orientation.
+    """
+    key = ("board", visual_bottom_is_white, BOARD_SIZE)
+    layer = LAYERS.get(key)
+    if layer is None:
+        layer = p.Surface((BOARD_SIZE + 24 + SHADOW_MARGIN, BOARD_SIZE + 24 + SHADOW_MARGIN), p.SRCALPHA)
+        # Draw the board's wooden/brown outer framing
+        drawTactilePanel(layer, p.Rect(0, 0, BOARD_SIZE + 24, BOARD_SIZE + 24), COLORS["dark"], COLORS["brown"], shadow_offset=6)
+        for r in range(DIMENSION):
+            for c in range(DIMENSION):
+                drawTile(layer, r, c, visual_bottom_is_white, False, -BOARD_LAYER_ORIGIN[0], -BOARD_LAYER_ORIGIN[1])
+        LAYERS[key] = layer
+    return layer
+
+def drawTile(surface, r, c, visual_bottom_is_white, is_selected, dx=0, dy=0):
+    """
+    Draws one board tile with its coordinate labels; (dx, dy) shifts it onto a layer.
+    """
     colors = [COLORS["square_light"], COLORS["square_dark"]]
-    for r in range(DIMENSION):
-        for c in range(DIMENSION):
-            color = colors[(r + c) % 2]
-            
-            visual_r = r if visual_bottom_is_white else 7 - r
-            visual_c = c if visual_bottom_is_white else 7 - c
-            
-            # 3D Tile effect
-            tile_rect = p.Rect(BOARD_PADDING + visual_c * SQ_SIZE + 2, BOARD_PADDING + visual_r * SQ_SIZE + 2, SQ_SIZE - 4, SQ_SIZE - 4)
-            is_selected = sqSelected == (r, c)
-            
-            if is_selected:
-                # Depressed tile: push the tile down, obscuring the shadow
-                tile_rect.move_ip(2, 2)
-                p.draw.rect(screen, color, tile_rect, border_radius=4)
-            else:
-                # Normal raised tile: draw shadow then tile
-                shadow_rect = tile_rect.move(2, 2)
-                p.draw.rect(screen, COLORS["dark"], shadow_rect, border_radius=4)
-                p.draw.rect(screen, color, tile_rect, border_radius=4)
-            
-            # Coordinates
-            font = p.font.SysFont("Courier New", 10, True)
-            if visual_c == 0: # Ranks
-                lbl = font.render(str(8-r), True, colors[1] if (r+c)%2==0 else colors[0])
-                screen.blit(lbl, (BOARD_PADDING + 4, BOARD_PADDING + visual_r * SQ_SIZE + 4))
-            if visual_r == 7: # Files
-                lbl = font.render(chr(ord('a') + c), True, colors[1] if (r+c)%2==0 else colors[0])
-                screen.blit(lbl, (BOARD_PADDING + (visual_c+1)*SQ_SIZE - 12, BOARD_PADDING + BOARD_SIZE - 14))
+    color = colors[(r + c) % 2]
+
+    visual_r = r if visual_bottom_is_white else 7 - r
+    visual_c = c if visual_bottom_is_white else 7 - c
+
+    # 3D Tile effect
+    tile_rect = p.Rect(BOARD_PADDING + visual_c * SQ_SIZE + 2 + dx, BOARD_PADDING + visual_r * SQ_SIZE + 2 + dy, SQ_SIZE - 4, SQ_SIZE - 4)
+
+    if is_selected:
+        # Depressed tile: push the tile down, obscuring the shadow
+        tile_rect.move_ip(2, 2)
+        p.draw.rect(surface, color, tile_rect, border_radius=4)
+    else:
+        # Normal raised tile: draw shadow then tile
+        shadow_rect = tile_rect.move(2, 2)
+        p.draw.rect(surface, COLORS["dark"], shadow_rect, border_radius=4)
+        p.draw.rect(surface, color, tile_rect, border_radius=4)
+
+    # Coordinates
+    if visual_c == 0: # Ranks
+        lbl = renderText(str(8-r), 10, colors[1] if (r+c)%2==0 else colors[0], bold=True)
+        surface.blit(lbl, (BOARD_PADDING + 4 + dx, BOARD_PADDING + visual_r * SQ_SIZE + 4 + dy))
+    if visual_r == 7: # Files
+        lbl = renderText(chr(ord('a') + c), 10, colors[1] if (r+c)%2==0 else colors[0], bold=True)
+        surface.blit(lbl, (BOARD_PADDING + (visual_c+1)*SQ_SIZE - 12 + dx, BOARD_PADDING + BOARD_SIZE - 14 + dy))
 
 def drawPieces(screen, board, sqSelected, whiteToMove, board_locked_to):
     """
@@ -757,10 +987,10 @@ def drawPieces(screen, board, sqSelected, whiteToMove, board_locked_to):
 
 def drawEndGamePopup(screen, gs):
     """
-    Renders a tactile popup overlay for Checkmate and Stalemate with custom messages.
+    Renders a tactile popup overlay for Checkmate, Stalemate and draws with custom messages.
     Centered specifically over the chessboard.
     """
-    if not gs.checkMate and not gs.staleMate:
+    if not (gs.checkMate or gs.staleMate or gs.repetitionDraw or gs.fiftyMoveDraw):
         return
         
     # Define custom messages
@@ -774,6 +1004,12 @@ def drawEndGamePopup(screen, gs):
     elif gs.staleMate:
         title = "STALEMATE"
         subtitle = "A peaceful, yet bitter draw."
+    elif gs.repetitionDraw:
+        title = "DRAW"
+        subtitle = "Threefold repetition. History repeats."
+    else:
+        title = "DRAW"
+        subtitle = "Fifty moves without progress."
 
     # popup dimensions (smaller & centered ONLY over the board)
     popup_width = 300
@@ -797,11 +1033,8 @@ def drawEndGamePopup(screen, gs):
     p.draw.rect(screen, COLORS["bg"], inner_rect, border_radius=8) # Deep bg
     
     # Render Text
-    font_title = p.font.SysFont("Courier New", 22, True)
-    font_subtitle = p.font.SysFont("Courier New", 12, False)
-    
-    title_surf = font_title.render(title, True, COLORS["dark"])
-    subtitle_surf = font_subtitle.render(subtitle, True, COLORS["terra"] if gs.checkMate else COLORS["brown"])
+    title_surf = renderText(title, 22, COLORS["dark"], bold=True)
+    subtitle_surf = renderText(subtitle, 12, COLORS["terra"] if gs.checkMate else COLORS["brown"])
     
     title_rect = title_surf.get_rect(center=(inner_rect.centerx, inner_rect.centery - 12))
     subtitle_rect = subtitle_surf.get_rect(center=(inner_rect.centerx, inner_rect.centery + 15))
@@ -857,8 +1090,7 @@ def showPromotionDialog(screen, isWhite):
         # Draw Dialog
         drawTactilePanel(screen, dialog_rect, COLORS["border"], COLORS["cream"], border_radius=12)
         
-        font = p.font.SysFont("Courier New", 16, True)
-        title = font.render("Choose Promotion:", True, COLORS["dark"])
+        title = renderText("Choose Promotion:", 16, COLORS["dark"], bold=True)
         screen.blit(title, (dialog_rect.centerx - title.get_width() // 2, dialog_rect.y + 15))
         
         # Draw Option Buttons
@@ -877,5 +1109,6 @@ def showPromotionDialog(screen, isWhite):
     return 'Q' # Fallback
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support() # The engine worker process, in PyInstaller builds
     main()
 
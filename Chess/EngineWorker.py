@@ -0,0 +1,107 @@
+"""
+Runs the search off the UI thread.
+The pygame loop posts positions to an EngineWorker and polls it once per frame; the search
+itself runs in a separate process with its own GameState, so it never competes with the
+loop for the interpreter lock and the window keeps drawing and taking input at full frame
+rate while the engine thinks. Posting a new position stops the search of the previous one,
+and results for positions that have since changed are dropped.
+"""
+
+import multiprocessing
+import queue
+
+from Chess.ChessEngine import GameState
+from Chess.ChessAI import Searcher, MAX_DEPTH
+
+DEFAULT_THINK_TIME = 1.0 # Seconds per position
+
+
+class EngineResult:
+    """
+    Answer to one posted position: the SearchResult (None when the side to move has no
+    legal moves) and the id post() returned for it.
+    """
+    __slots__ = ('requestId', 'result')
+
+    def __init__(self, requestId, result):
+        self.requestId = requestId
+        self.result = result
+
+
+class EngineWorker:
+    """
+    Request/response queues in front of a Searcher running in a worker process.
+    """
+    def __init__(self, ttSizeBits=16):
+        # Spawned, not forked: a fork would copy the pygame window and mixer into the child
+        context = multiprocessing.get_context("spawn")
+        self.requests = context.Queue()
+        self.responses = context.Queue()
+        self.stopEvent = context.Event()
+        self.latestRequest = context.Value('i', 0)
+        self.thinking = False
+        self.process = context.Process(target=_run, daemon=True,
+                                       args=(self.requests, self.responses, self.stopEvent, self.latestRequest, ttSizeBits))
+        self.process.start()
+
+    def post(self, gs, timeLimit=DEFAULT_THINK_TIME, maxDepth=MAX_DEPTH):
+        """
+        Asks for an analysis of gs (copied, so the caller may keep playing on it) and
+        returns the request id. Any search still running is stopped.
+        """
+        requestId = self.latestRequest.value + 1
+        self.latestRequest.value = requestId
+        self.stopEvent.set()
+        self.requests.put((requestId, gs.snapshot(), timeLimit, maxDepth))
+        self.thinking = True
+        return requestId
+
+    def poll(self):
+        """
+        Returns the EngineResult for the last posted position once it is ready, else None.
+        Never blocks.
+        """
+        latest = None
+        while True:
+            try:
+                response = self.responses.get_nowait()
+            except queue.Empty:
+                break
+            if response.requestId == self.latestRequest.value:
+                latest = response
+                self.thinking = False
+        return latest
+
+    def cancel(self):
+        """
+        Forgets the posted position (its result will be dropped) and stops the search.
+        """
+        self.latestRequest.value += 1
+        self.stopEvent.set()
+        self.thinking = False
+
+    def close(self):
+        self.cancel()
+        self.requests.put(None)
+        self.process.join(2.0)
+        if self.process.is_alive():
+            self.process.terminate()
+
+
+def _run(requests, responses, stopEvent, latestRequest, ttSizeBits):
+    """
+    Worker process: searches posted positions one at a time until it receives None.
+    """
+    searcher = Searcher(ttSizeBits, stopEvent=stopEvent)
+    while True:
+        request = requests.get()
+        if request is None:
+            return
+        requestId, root, timeLimit, maxDepth = request
+        stopEvent.clear()
+        # Checked after clearing: a position posted from here on sets the event again
+        if requestId != latestRequest.value:
+            continue # Superseded while queued
+        gs = GameState.fromSnapshot(root)
+        result = searcher.search(gs, maxDepth=maxDepth, timeLimit=timeLimit)
+        responses.put(EngineResult(requestId, result))
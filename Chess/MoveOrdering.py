@@ -0,0 +1,106 @@
+"""
+Move ordering for the alpha-beta search.
+Alpha-beta prunes the most when the best move is searched first. Moves come out in this order:
+the hash move from the transposition table, captures and promotions (MVV-LVA), the two
+killer moves of the ply (quiet moves that caused a cutoff in a sibling node), then the
+remaining quiet moves by their butterfly history score (how often a from/to pair
+caused cutoffs anywhere in the tree).
+The tables live as long as the MoveOrdering object, so they carry over between iterative
+deepening iterations and between the moves of a game; clear() resets them for a new game.
+"""
+
+from Chess.ChessEngine import CAPTURE_FLAG, PROMOTION
+
+MAX_PLY = 128
+HISTORY_MAX = 1 << 20 # History scores are halved once any of them passes this
+_KILLER_SCORE = 1 << 30 # Above any history score
+
+
+class MoveOrdering:
+    """
+    Killer slots per ply, a butterfly history table per side (indexed by from | to << 6,
+    the low 12 bits of a packed move) and cutoff statistics.
+    """
+    def __init__(self):
+        self.killers = [[0, 0] for _ in range(MAX_PLY)]
+        self.history = {'w': [0] * 4096, 'b': [0] * 4096}
+        self.cutoffs = 0
+        self.firstMoveCutoffs = 0
+
+    def clear(self):
+        """
+        Forgets everything learned (call between games).
+        """
+        for slots in self.killers:
+            slots[0] = slots[1] = 0
+        self.history = {'w': [0] * 4096, 'b': [0] * 4096}
+        self.cutoffs = 0
+        self.firstMoveCutoffs = 0
+
+    def newSearch(self):
+        """
+        Starts a search: killers are ply-specific and go stale after a move is played, history
+        is kept but halved so the new position's cutoffs quickly dominate. Statistics restart.
+        """
+        for slots in self.killers:
+            slots[0] = slots[1] = 0
+        for table in self.history.values():
+            for i in range(4096):
+                table[i] >>= 1
+        self.cutoffs = 0
+        self.firstMoveCutoffs = 0
+
+    def orderedMoves(self, gs, ply, hashMove=0):
+        """
+        Yields the legal moves of gs in search order. Quiet moves are only generated and
+        sorted once the hash move and the captures have failed to cut off.
+        """
+        yield from gs.iterLegalMoves(order=("hash", "captures"), hashMove=hashMove)
+        quiets = list(gs.iterLegalMoves(order=("quiets",), hashMove=hashMove))
+        if not quiets:
+            return
+        history = self.history['w' if gs.whiteToMove else 'b']
+        killer0, killer1 = self.killers[ply] if ply < MAX_PLY else (0, 0)
+
+        def score(code):
+            if code == killer0:
+                return _KILLER_SCORE + 1
+            if code == killer1:
+                return _KILLER_SCORE
+            return history[code & 4095]
+        quiets.sort(key=score, reverse=True)
+        yield from quiets
+
+    def recordCutoff(self, code, depth, ply, whiteToMove, moveNumber, quietsTried=()):
+        """
+        Called when code (the moveNumber-th move searched, counting from 1) failed high.
+        Quiet moves become killers and gain history; the quiet moves searched before it
+        (quietsTried) lose some, since they were ordered too high.
+        """
+        self.cutoffs += 1
+        if moveNumber == 1:
+            self.firstMoveCutoffs += 1
+        if code & CAPTURE_FLAG or code >> 12 & PROMOTION:
+            return # Captures are ordered by MVV-LVA, not by the tables
+        if ply < MAX_PLY:
+            slots = self.killers[ply]
+            if slots[0] != code:
+                slots[1] = slots[0]
+                slots[0] = code
+        history = self.history['w' if whiteToMove else 'b']
+        bonus = depth * depth
+        history[code & 4095] += bonus
+        overflow = history[code & 4095] > HISTORY_MAX
+        for tried in quietsTried:
+            history[tried & 4095] -= bonus
+            overflow = overflow or history[tried & 4095] < -HISTORY_MAX
+        if overflow:
+            for i in range(4096):
+                history[i] >>= 1
+
+    def firstMoveCutoffRate(self):
+        """
+        Fraction of beta cutoffs produced by the first move searched: the usual measure of
+        ordering quality (well-ordered engines reach 0.9 and more).
+        """
+        return self.firstMoveCutoffs / self.cutoffs if self.cutoffs else 0.0
@@ -0,0 +1,225 @@
+"""
+Parallel search across processes by root splitting.
+Every iterative deepening iteration deals the root moves out round-robin (best moves of
+the previous iteration first) to a pool of worker processes. Each worker rebuilds the root
+position in its own GameState and searches its share with its own long-lived Searcher, whose
+move ordering tables stay warm between iterations and moves. All workers read and write one
+transposition table in shared memory, so a position one of them has searched is a hit for the
+others. The best score over all workers wins. Workers don't share alpha bounds, so the speedup
+is below linear; the command line reports it at fixed depth against a single process.
+
+Usage:
+    python -m Chess.ParallelSearch --threads 4 --depth 4
+    python -m Chess.ParallelSearch --threads 4 --depth 5 --fen "<FEN>"
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+
+# Allow running as a script as well as with -m
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Chess.ChessEngine import GameState, START_FEN
+from Chess.ChessAI import Searcher, SearchResult, MATE_THRESHOLD, MAX_DEPTH
+from Chess.SharedTable import SharedTranspositionTable
+
+_searcher = None # The worker process's own Searcher (see _initWorker)
+_clearCount = None # Shared count of ParallelSearcher.clear calls
+_clearsSeen = 0 # How many of them this worker has applied to its move ordering tables
+
+# Positions for the speedup report: opening, middlegames and an endgame
+BENCHMARK_POSITIONS = [
+    START_FEN,
+    "r1bqkb1r/pppp1ppp/2n2n2/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 4 4",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+]
+
+
+class ParallelSearcher:
+    """
+    Drop-in replacement for Searcher (same search/stop/clear) that uses threads worker
+    processes sharing a hashMegabytes transposition table. With threads=1 it simply runs a
+    Searcher in this process. The workers are started here, so their start-up time is never
+    charged to a move, and live until close(), which frees them and the table.
+    stopEvent stays set after stop(): the caller clears it before starting the next search,
+    so a stop that arrives before the search gets going isn't lost.
+    """
+    def __init__(self, threads=1, hashMegabytes=32):
+        self.threads = max(1, threads)
+        self.table = SharedTranspositionTable(hashMegabytes)
+        # Spawned, not forked: the Uci engine creates this while another thread may hold the
+        # stdin lock, which a forked child would inherit and deadlock on
+        context = multiprocessing.get_context("spawn")
+        self.stopEvent = context.Event()
+        self._local = None
+        self._executor = None
+        if self.threads == 1:
+            self._local = Searcher(stopEvent=self.stopEvent, tt=self.table)
+            return
+        self._clearCount = context.Value('i', 0)
+        started = context.Barrier(self.threads)
+        self._executor = ProcessPoolExecutor(max_workers=self.threads, mp_context=context, initializer=_initWorker,
+                                             initargs=(self.table, self.stopEvent, self._clearCount, started))
+        # No worker finishes a task before all have started (see _initWorker), so every submit
+        # here finds none idle and spawns one; waiting for the tasks waits for the whole pool
+        wait([self._executor.submit(_ready) for _ in range(self.threads)])
+
+    def close(self):
+        """
+        Shuts the worker processes down and frees the shared table.
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        self.table.close()
+
+    def clear(self):
+        """
+        Forgets all transposition and move ordering tables (call between games). The workers
+        keep running and clear their move ordering tables before their next search.
+        """
+        if self._local is not None:
+            self._local.clear()
+        else:
+            self.table.clear()
+            with self._clearCount.get_lock():
+                self._clearCount.value += 1
+
+    def stop(self):
+        """
+        Asks a running search to return as soon as possible (safe to call from another thread).
+        """
+        self.stopEvent.set()
+
+    def search(self, gs, maxDepth=MAX_DEPTH, timeLimit=None, nodeLimit=None, onIteration=None):
+        """
+        Same contract as Searcher.search: returns the last completed SearchResult, or None
+        if the side to move has no legal moves. gs is left as it was.
+        """
+        if self._local is not None:
+            return self._local.search(gs, maxDepth, timeLimit, nodeLimit, onIteration)
+        start = time.perf_counter()
+        self.table.newSearch() # Workers only attach to the table, this process ages it
+        rootMoves = list(gs.iterLegalMoves())
+        if not rootMoves:
+            return None
+
+        root = gs.snapshot()
+        result = SearchResult(rootMoves[0], 0, 0, [rootMoves[0]], 0, 0.0)
+        nodes = 0
+        for depth in range(1, maxDepth + 1):
+            remaining = None
+            if timeLimit is not None:
+                remaining = timeLimit - (time.perf_counter() - start)
+                if remaining <= 0:
+                    break
+            workerNodeLimit = None
+            if nodeLimit is not None:
+                workerNodeLimit = max(1, (nodeLimit - nodes) // self.threads)
+            shares = [rootMoves[i::self.threads] for i in range(self.threads)]
+            futures = [self._executor.submit(_searchShare, root, share, depth, remaining, workerNodeLimit, depth == 1)
+                       for share in shares if share]
+
+            scores = []
+            bestScore, bestPv = None, None
+            finished = True
+            for future in futures:
+                shareScores, pv, shareNodes, stopped = future.result()
+                nodes += shareNodes
+                finished = finished and not stopped
+                scores.extend(shareScores)
+                if shareScores:
+                    shareBest = max(score for _, score in shareScores)
+                    if bestScore is None or shareBest > bestScore:
+                        bestScore, bestPv = shareBest, pv
+            if not finished and (depth > 1 or bestPv is None):
+                break # Unfinished iteration: keep the previous result
+            result = SearchResult(bestPv[0], bestScore, depth, bestPv, nodes, time.perf_counter() - start)
+            if onIteration is not None:
+                onIteration(result)
+            if not finished or abs(bestScore) >= MATE_THRESHOLD:
+                break
+            if nodeLimit is not None and nodes >= nodeLimit:
+                break
+            # Next iteration: best moves first, so every worker starts with a strong candidate
+            searched = dict(scores)
+            rootMoves.sort(key=lambda code: searched.get(code, -MATE_THRESHOLD * 2), reverse=True)
+        result.nodes = nodes
+        result.elapsed = time.perf_counter() - start
+        return result
+
+
+def _initWorker(table, stopEvent, clearCount, started):
+    global _searcher, _clearCount
+    _searcher = Searcher(stopEvent=stopEvent, tt=table) # table arrives attached to the shared buffer
+    _clearCount = clearCount
+    started.wait()
+
+
+def _ready():
+    """
+    No-op task used to make the pool start its workers.
+    """
+
+
+def _searchShare(root, moves, depth, timeLimit, nodeLimit, newSearch):
+    """
+    Runs in a worker process: searches its share of the root moves.
+    Returns ([(move, score)], best pv, nodes, stopped).
+    """
+    global _clearsSeen
+    if _clearCount.value != _clearsSeen:
+        _clearsSeen = _clearCount.value
+        _searcher.ordering.clear() # The table itself was wiped by the owner
+    gs = GameState.fromSnapshot(root)
+    scores, pv = _searcher.searchMoves(gs, moves, depth, timeLimit, nodeLimit, newSearch)
+    return scores, pv, _searcher.nodes, _searcher.stopRequested
+
+
+def measureSpeedup(fens, depth, threads, out=sys.stdout):
+    """
+    Searches every position to a fixed depth with one process and with threads processes,
+    printing both times and the speedup. Returns the overall speedup.
+    """
+    parallel = ParallelSearcher(threads)
+    totalSingle = totalParallel = 0.0
+    try:
+        for fen in fens:
+            start = time.perf_counter()
+            single = Searcher().search(GameState.from_fen(fen), maxDepth=depth)
+            singleTime = time.perf_counter() - start
+            parallel.clear() # Cold tables, like the fresh single-process Searcher
+            start = time.perf_counter()
+            multi = parallel.search(GameState.from_fen(fen), maxDepth=depth)
+            parallelTime = time.perf_counter() - start
+            totalSingle += singleTime
+            totalParallel += parallelTime
+            print(f"{fen[:40]:<40}  1 process {singleTime:7.2f}s {single.nodes:>8} nodes  "
+                  f"{threads} processes {parallelTime:7.2f}s {multi.nodes:>8} nodes  "
+                  f"speedup {singleTime / parallelTime:5.2f}x", file=out)
+    finally:
+        parallel.close()
+    speedup = totalSingle / totalParallel if totalParallel > 0 else 0.0
+    print(f"Total: 1 process {totalSingle:.2f}s, {threads} processes {totalParallel:.2f}s, "
+          f"speedup {speedup:.2f}x on {os.cpu_count()} cores", file=out)
+    return speedup
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fixed-depth speedup of the parallel search.")
+    parser.add_argument("--threads", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("--depth", type=int, default=4, help="search depth")
+    parser.add_argument("--fen", help="a single position instead of the benchmark set")
+    args = parser.parse_args(argv)
+    measureSpeedup([args.fen] if args.fen else BENCHMARK_POSITIONS, args.depth, args.threads)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
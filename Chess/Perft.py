@@ -0,0 +1,143 @@
+"""
+Perft (performance test) for the move generator.
+Counts the leaf nodes of the legal move tree to a fixed depth and compares them with
+published reference counts, so any change to move generation can be checked for
+correctness and speed.
+
+Usage:
+    python -m Chess.Perft                      # reference suite up to depth 3
+    python -m Chess.Perft --depth 5            # deeper suite (slow in pure Python)
+    python -m Chess.Perft --fen "<FEN>" --depth 4 --divide
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Allow running as a script as well as with -m
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Chess.ChessEngine import GameState, START_FEN
+
+# (name, FEN, expected node counts for depth 1, 2, 3, ...)
+# Counts from the Chess Programming Wiki perft results and Martin Sedlak's edge-case suite.
+REFERENCE_POSITIONS = [
+    ("Start position", START_FEN,
+     [20, 400, 8902, 197281, 4865609]),
+    ("Kiwipete", "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+     [48, 2039, 97862, 4085603]),
+    ("Position 3 (en passant pins)", "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+     [14, 191, 2812, 43238, 674624]),
+    ("Position 4 (promotions)", "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+     [6, 264, 9467, 422333]),
+    ("Position 5", "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+     [44, 1486, 62379, 2103487]),
+    ("Illegal en passant #1", "3k4/3p4/8/K1P4r/8/8/8/8 b - - 0 1",
+     [18, 92, 1670, 10138, 185429, 1134888]),
+    ("Illegal en passant #2", "8/8/4k3/8/2p5/8/B2P2K1/8 w - - 0 1",
+     [13, 102, 1266, 10276, 135655, 1015133]),
+    ("En passant gives check", "8/8/1k6/2b5/2pP4/8/5K2/8 b - d3 0 1",
+     [15, 126, 1928, 13931, 206379, 1440467]),
+    ("Castling rights lost to captures", "r3k2r/1b4bq/8/8/8/8/7B/R3K2R w KQkq - 0 1",
+     [26, 1141, 27826, 1274206]),
+    ("Promote out of check", "2K2r2/4P3/8/8/8/8/8/3k4 w - - 0 1",
+     [11, 133, 1442, 19174, 266199, 3821001]),
+    ("Promote to give check", "4k3/1P6/8/8/8/8/K7/8 w - - 0 1",
+     [9, 40, 472, 2661, 38983, 217342]),
+    ("Underpromote to give check", "8/P1k5/K7/8/8/8/8/8 w - - 0 1",
+     [6, 27, 273, 1329, 18135, 92683]),
+    # Castling rights in the FEN that the pieces no longer allow: from_fen has to drop them
+    ("Castling rights without king", "4k3/8/8/8/8/8/8/4K3 w KQkq - 0 1",
+     [5, 25, 170, 1156]),
+    ("Castling rights without rook", "4k2r/8/8/8/8/8/8/1R2K1R1 w KQkq - 0 1",
+     [24, 306, 7874, 117437]),
+]
+
+
+def perft(gs, depth):
+    """
+    Returns the number of leaf nodes reachable from gs in exactly depth plies.
+    """
+    if depth == 0:
+        return 1
+    moves = gs.getValidMoves()
+    if depth == 1:
+        return len(moves) # Bulk counting: the leaves don't need to be played
+    nodes = 0
+    for move in moves:
+        gs.makeMove(move)
+        nodes += perft(gs, depth - 1)
+        gs.undoMove()
+    return nodes
+
+
+def divide(gs, depth):
+    """
+    Returns [(uci move, nodes)] for every root move, the standard tool for locating
+    the first move whose subtree count disagrees with a reference engine.
+    """
+    results = []
+    for move in gs.getValidMoves():
+        gs.makeMove(move)
+        results.append((move.getUciNotation(), perft(gs, depth - 1)))
+        gs.undoMove()
+    return results
+
+
+def runSuite(maxDepth=3, positions=REFERENCE_POSITIONS, out=sys.stdout):
+    """
+    Runs every reference position up to maxDepth, printing nodes, wall time and nodes/sec.
+    Returns True when all counts match.
+    """
+    allPassed = True
+    totalNodes = 0
+    totalTime = 0.0
+    for name, fen, expected in positions:
+        for depth in range(1, min(maxDepth, len(expected)) + 1):
+            gs = GameState.from_fen(fen)
+            start = time.perf_counter()
+            nodes = perft(gs, depth)
+            elapsed = time.perf_counter() - start
+            totalNodes += nodes
+            totalTime += elapsed
+            passed = nodes == expected[depth - 1]
+            allPassed = allPassed and passed
+            print(f"{name:<34} depth {depth}  {nodes:>9} nodes  {elapsed:8.3f}s  {_nodesPerSecond(nodes, elapsed):>9} nps  "
+                  f"{'OK' if passed else 'FAIL (expected ' + str(expected[depth - 1]) + ')'}", file=out)
+    print(f"Total: {totalNodes} nodes in {totalTime:.3f}s ({_nodesPerSecond(totalNodes, totalTime)} nps) - "
+          f"{'all passed' if allPassed else 'FAILURES'}", file=out)
+    return allPassed
+
+
+def _nodesPerSecond(nodes, elapsed):
+    return int(nodes / elapsed) if elapsed > 0 else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Perft node counts for the chess move generator.")
+    parser.add_argument("--depth", type=int, default=3, help="search depth (suite: maximum depth per position)")
+    parser.add_argument("--fen", help="run a single position instead of the reference suite")
+    parser.add_argument("--divide", action="store_true", help="print the node count below each root move")
+    args = parser.parse_args(argv)
+
+    if args.fen is None and not args.divide:
+        return 0 if runSuite(args.depth) else 1
+
+    gs = GameState.from_fen(args.fen or START_FEN)
+    start = time.perf_counter()
+    if args.divide:
+        nodes = 0
+        for name, count in divide(gs, args.depth):
+            print(f"{name}: {count}")
+            nodes += count
+        print()
+    else:
+        nodes = perft(gs, args.depth)
+    elapsed = time.perf_counter() - start
+    print(f"Nodes: {nodes}  Time: {elapsed:.3f}s  NPS: {_nodesPerSecond(nodes, elapsed)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
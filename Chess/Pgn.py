@@ -0,0 +1,377 @@
+"""
+Streaming PGN reader and game replayer.
+Games are read one at a time from a file (memory-mapped), an open file or any iterable of
+lines, so memory stays bounded by the largest single game no matter how big the file is.
+SAN moves are resolved straight from the bitboards (only the pieces that can reach the
+target square are looked at) and fall back to the full legal move list when that is ambiguous.
+
+Usage:
+    python -m Chess.Pgn games.pgn              # parse only: games/sec
+    python -m Chess.Pgn games.pgn --replay     # also replay every move on a GameState
+    python -m Chess.Pgn games.pgn --replay --limit 10000
+"""
+
+import argparse
+import itertools
+import mmap
+import os
+import re
+import sys
+import time
+
+# Allow running as a script as well as with -m
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Chess.Bitboard import (SQUARE_BB, KNIGHT_ATTACKS, KING_ATTACKS, PAWN_ATTACKS, BETWEEN, rookAttacks,
+                            bishopAttacks)
+from Chess.ChessEngine import (GameState, Move, encodeMove, moveCodeToUci, QUIET_MOVE, DOUBLE_PAWN_PUSH,
+                               KING_CASTLE, QUEEN_CASTLE, CAPTURE, EN_PASSANT, PROMOTION_CODES)
+
+RESULTS = ("1-0", "0-1", "1/2-1/2", "*")
+
+_HEADER_RE = re.compile(r'\[\s*(\w+)\s+"((?:[^"\\]|\\.)*)"\s*\]')
+# Movetext tokens: comments, variations, NAGs and move numbers are matched so they can be skipped
+_TOKEN_RE = re.compile(r'\{[^}]*\}|;[^\n]*|[()]|\$\d+|\d+\.+|1-0|0-1|1/2-1/2|\*|[A-Za-z0-9][^\s(){};$]*')
+_SAN_RE = re.compile(r'([NBRQK])?([a-h])?([1-8])?x?([a-h][1-8])(?:=?([NBRQ]))?')
+# Lines a rook or bishop on each square would see on an empty board
+_ROOK_LINES = [rookAttacks(sq, 0) for sq in range(64)]
+_BISHOP_LINES = [bishopAttacks(sq, 0) for sq in range(64)]
+
+
+class PgnGame:
+    """
+    One game from a PGN file: the tag pairs, the mainline moves in SAN and the result.
+    """
+    __slots__ = ('headers', 'moves', 'result')
+
+    def __init__(self, headers, moves, result):
+        self.headers = headers
+        self.moves = moves
+        self.result = result
+
+    def startingPosition(self):
+        """
+        A fresh GameState at the game's start (the FEN tag when present, else the initial position).
+        """
+        fen = self.headers.get("FEN")
+        return GameState.from_fen(fen) if fen else GameState()
+
+    def replay(self, gs=None):
+        """
+        Plays the moves one by one, yielding the GameState after each move (the same object,
+        updated in place, with the move on gs.moveLog). Stops early if the consumer does.
+        Raises ValueError on a move that can't be resolved or played; gs is unusable after that.
+        """
+        if gs is None:
+            gs = self.startingPosition()
+        for ply, san in enumerate(self.moves, 1):
+            code = sanToMoveCode(gs, san)
+            try:
+                gs.makeMoveCode(code)
+            except (KeyError, IndexError) as e:
+                raise ValueError(f"Move '{san}' (ply {ply}) could not be played: {e!r}") from e
+            yield gs
+
+
+def readGames(source):
+    """
+    Yields a PgnGame for every game in source: a file path (read through mmap), an open
+    file (text or binary), an mmap object or an iterable of lines. Only the game being
+    parsed is held in memory.
+    """
+    headers = {}
+    movetext = []
+    inComment = False # A {...} comment left open by an earlier line (e.g. a wrapped [%clk ...])
+    lines = iter(_lines(source))
+    first = next(lines, None)
+    if first is not None:
+        lines = itertools.chain((first.lstrip('\ufeff'),), lines) # Drop a UTF-8 byte order mark
+    for line in lines:
+        line = line.strip()
+        if inComment:
+            movetext.append(line)
+            inComment = _endsInComment(line, True)
+            continue
+        if not line or line[0] == '%':
+            continue
+        if line[0] == '[':
+            if movetext:
+                # A tag after movetext starts the next game (covers files with missing results)
+                yield _buildGame(headers, movetext)
+                headers, movetext = {}, []
+            match = _HEADER_RE.match(line)
+            if match:
+                headers[match.group(1)] = match.group(2).replace('\\"', '"').replace('\\\\', '\\')
+            continue
+        movetext.append(line)
+        inComment = _endsInComment(line, False)
+    if movetext or headers:
+        yield _buildGame(headers, movetext)
+
+
+def _endsInComment(line, inComment):
+    """
+    Whether a brace comment is still open at the end of line, given whether one was open
+    at its start. Braces inside a ';' rest-of-line comment don't count.
+    """
+    if not inComment and '{' not in line:
+        return False
+    if inComment and '}' not in line:
+        return True
+    for ch in line:
+        if inComment:
+            inComment = ch != '}'
+        elif ch == '{':
+            inComment = True
+        elif ch == ';':
+            break
+    return inComment
+
+
+def _lines(source):
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return # mmap can't map an empty file
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                yield from _lines(mm)
+        return
+    if hasattr(source, "readline"):
+        first = source.readline()
+        if isinstance(first, bytes):
+            lines = iter(source.readline, b"")
+            if first:
+                yield first.decode("utf-8", "replace")
+            for line in lines:
+                yield line.decode("utf-8", "replace")
+        else:
+            lines = iter(source.readline, "")
+            if first:
+                yield first
+            yield from lines
+        return
+    yield from source
+
+
+def _buildGame(headers, movetext):
+    moves = []
+    result = headers.get("Result", "*")
+    depth = 0 # Variation nesting: only the mainline is kept
+    for token in _TOKEN_RE.findall("\n".join(movetext)):
+        first = token[0]
+        if first == '(':
+            depth += 1
+        elif first == ')':
+            depth = max(0, depth - 1)
+        elif depth or first in '{;$':
+            continue
+        elif token in RESULTS:
+            result = token
+        elif first.isdigit() and first != '0':
+            continue # Move number
+        else:
+            moves.append(token)
+    return PgnGame(headers, moves, result)
+
+
+def sanToMoveCode(gs, san):
+    """
+    Resolves a SAN move (e.g. Nbd7, exd6, e8=Q+, O-O) to a packed move for gs.
+    Only the pieces that can reach the target square are considered; pins are only looked
+    at when more than one of them qualifies, and anything still unclear is matched against
+    the full legal move list. The move found is checked with gs.isLegalMove, so an illegal
+    move (a pinned piece, ignoring check, castling without the right) is never replayed.
+    Raises ValueError if the move can't be resolved to a legal move.
+    """
+    code = _sanToCandidateCode(gs, san)
+    if code is None or not _isLegalCandidate(gs, code):
+        return _resolveFromLegalMoves(gs, san)
+    return code
+
+
+def _isLegalCandidate(gs, code):
+    """
+    Legality test for a move from _sanToCandidateCode, whose piece is known to reach the
+    target square. Castling and en passant get the full gs.isLegalMove check; any other move
+    is legal if its capture flag matches the target square and it doesn't leave the King
+    attacked (a pinned piece, an unanswered check, a King stepping into an attack).
+    """
+    startSq, endSq, flags = code & 63, code >> 6 & 63, code >> 12
+    allyColor, enemyColor = ('w', 'b') if gs.whiteToMove else ('b', 'w')
+    kingRow, kingCol = gs.whiteKingLocation if gs.whiteToMove else gs.blackKingLocation
+    kingSq = kingRow * 8 + kingCol
+    if flags in (KING_CASTLE, QUEEN_CASTLE, EN_PASSANT):
+        return gs.isLegalMove(code)
+    target = SQUARE_BB[endSq]
+    enemy = gs.colorBitboards[enemyColor]
+    if gs.colorBitboards[allyColor] & target or bool(enemy & target) != bool(flags & CAPTURE):
+        return False
+    if startSq == kingSq:
+        occupied = (gs.colorBitboards[allyColor] | enemy) ^ SQUARE_BB[kingSq]
+        return not gs.isSquareAttacked(endSq, occupied, enemyColor)
+    pieces = gs.pieceBitboards
+    # Knights and Pawns can't be blocked, so they only matter if the move doesn't capture them
+    if (KNIGHT_ATTACKS[kingSq] & pieces[enemyColor + 'N'] | PAWN_ATTACKS[allyColor][kingSq] & pieces[enemyColor + 'P']) & ~target:
+        return False
+    # Sliders are tested only when they share a line with the King, with the board as it is after the move
+    queens = pieces[enemyColor + 'Q']
+    sliders = (_ROOK_LINES[kingSq] & (pieces[enemyColor + 'R'] | queens) |
+               _BISHOP_LINES[kingSq] & (pieces[enemyColor + 'B'] | queens)) & ~target
+    occupied = (gs.colorBitboards[allyColor] | enemy) ^ SQUARE_BB[startSq] | target
+    while sliders:
+        low = sliders & -sliders
+        if not BETWEEN[kingSq][low.bit_length() - 1] & occupied:
+            return False
+        sliders ^= low
+    return True
+
+
+def _sanToCandidateCode(gs, san):
+    """
+    Fast path of sanToMoveCode: the move san most likely means, or None if that's unclear.
+    Not checked for legality.
+    """
+    allyColor, enemyColor = ('w', 'b') if gs.whiteToMove else ('b', 'w')
+    kingRow, kingCol = gs.whiteKingLocation if gs.whiteToMove else gs.blackKingLocation
+    kingSq = kingRow * 8 + kingCol
+
+    stripped = san.rstrip("+#!?")
+    if stripped in ("O-O", "0-0", "O-O-O", "0-0-0"):
+        if kingSq & 7 != 4:
+            return None # King off its starting file: can't castle
+        if len(stripped) == 3:
+            return encodeMove(kingSq, kingSq + 2, KING_CASTLE)
+        return encodeMove(kingSq, kingSq - 2, QUEEN_CASTLE)
+    match = _SAN_RE.fullmatch(stripped)
+    if match is None:
+        raise ValueError(f"Unreadable SAN move '{san}'")
+    piece, fromFile, fromRank, target, promotion = match.groups()
+    endSq = Move.ranksToRows[target[1]] * 8 + Move.filesToCols[target[0]]
+    pieces = gs.pieceBitboards
+    occupied = gs.colorBitboards['w'] | gs.colorBitboards['b']
+    flags = CAPTURE if gs.colorBitboards[enemyColor] & SQUARE_BB[endSq] else QUIET_MOVE
+
+    if piece is None:
+        # Pawn: the origin follows from the target square and the capture file
+        back = 8 if allyColor == 'w' else -8
+        if fromFile is not None and Move.filesToCols[fromFile] != endSq & 7:
+            startSq = endSq + back - (endSq & 7) + Move.filesToCols[fromFile]
+            if not flags and gs.enPassantPossible == (endSq >> 3, endSq & 7):
+                flags = EN_PASSANT
+        else:
+            startSq = endSq + back
+            if 0 <= startSq < 64 and not pieces[allyColor + 'P'] & SQUARE_BB[startSq] and not occupied & SQUARE_BB[startSq]:
+                startSq += back
+                flags = DOUBLE_PAWN_PUSH
+        if not 0 <= startSq < 64 or not pieces[allyColor + 'P'] & SQUARE_BB[startSq]:
+            return None
+        if flags == DOUBLE_PAWN_PUSH and startSq >> 3 != (6 if allyColor == 'w' else 1):
+            return None # Only from the starting rank
+        if (startSq & 7 != endSq & 7) != bool(flags & CAPTURE) or (endSq >> 3 in (0, 7)) != (promotion is not None):
+            return None # A diagonal step must capture, a straight one must not; promotion exactly on the last rank
+        if promotion is not None:
+            flags |= PROMOTION_CODES[promotion]
+        return encodeMove(startSq, endSq, flags)
+
+    # Pieces: look backwards from the target square for pieces of the right type
+    if piece == 'N':
+        candidates = KNIGHT_ATTACKS[endSq]
+    elif piece == 'B':
+        candidates = bishopAttacks(endSq, occupied)
+    elif piece == 'R':
+        candidates = rookAttacks(endSq, occupied)
+    elif piece == 'Q':
+        candidates = rookAttacks(endSq, occupied) | bishopAttacks(endSq, occupied)
+    else:
+        candidates = KING_ATTACKS[endSq]
+    candidates &= pieces[allyColor + piece]
+    if fromFile is not None or fromRank is not None:
+        candidates = _filterOrigins(candidates, fromFile, fromRank)
+    if candidates & (candidates - 1):
+        # Several pieces reach the square: SAN leaves out pieces that are pinned away from it
+        pinLines = gs.getPins(kingSq, allyColor, enemyColor)
+        for sq in list(pinLines):
+            if candidates & SQUARE_BB[sq] and not pinLines[sq] & SQUARE_BB[endSq]:
+                candidates ^= SQUARE_BB[sq]
+    if not candidates or candidates & (candidates - 1):
+        return None
+    return encodeMove(candidates.bit_length() - 1, endSq, flags)
+
+
+def _filterOrigins(candidates, fromFile, fromRank):
+    result = 0
+    while candidates:
+        low = candidates & -candidates
+        sq = low.bit_length() - 1
+        candidates ^= low
+        if (fromFile is None or Move.filesToCols[fromFile] == sq & 7) and \
+                (fromRank is None or Move.ranksToRows[fromRank] == sq >> 3):
+            result |= low
+    return result
+
+
+def _resolveFromLegalMoves(gs, san):
+    """
+    Slow path: matches the SAN move against every legal move in the position.
+    """
+    match = _SAN_RE.fullmatch(san.rstrip("+#!?"))
+    if match is not None:
+        piece, fromFile, fromRank, target, promotion = match.groups()
+        found = []
+        for code in gs.generateLegalMoves():
+            uci = moveCodeToUci(code)
+            startSq = code & 63
+            movedPiece = gs.board[startSq >> 3][startSq & 7][1]
+            if uci[2:4] == target and movedPiece == (piece or 'P') and \
+                    (fromFile is None or uci[0] == fromFile) and (fromRank is None or uci[1] == fromRank) and \
+                    (promotion or '') == uci[4:].upper():
+                found.append(code)
+        if len(found) == 1:
+            return found[0]
+    raise ValueError(f"Illegal or ambiguous move '{san}' in {gs.to_fen()}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream games from a PGN file and report throughput.")
+    parser.add_argument("path", help="PGN file")
+    parser.add_argument("--replay", action="store_true", help="replay every move on a GameState")
+    parser.add_argument("--limit", type=int, help="stop after this many games")
+    args = parser.parse_args(argv)
+
+    games = plies = errors = 0
+    start = time.perf_counter()
+    for game in readGames(args.path):
+        games += 1
+        if args.replay:
+            try:
+                for _ in game.replay():
+                    plies += 1
+            except ValueError as e:
+                errors += 1
+                print(f"Game {games}: {e}", file=sys.stderr)
+        else:
+            plies += len(game.moves)
+        if args.limit is not None and games >= args.limit:
+            break
+    elapsed = time.perf_counter() - start
+    print(f"Games: {games}  Plies: {plies}  Errors: {errors}  Time: {elapsed:.3f}s  "
+          f"Games/sec: {_perSecond(games, elapsed)}  Plies/sec: {_perSecond(plies, elapsed)}  "
+          f"Peak memory: {_peakMemoryMegabytes()}")
+    return 1 if errors else 0
+
+
+def _perSecond(count, elapsed):
+    return int(count / elapsed) if elapsed > 0 else 0
+
+
+def _peakMemoryMegabytes():
+    try:
+        import resource
+    except ImportError: # Not available on Windows
+        return "n/a"
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return f"{peak / (1024 * 1024 if sys.platform == 'darwin' else 1024):.1f} MB"
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""
+Transposition table in a flat shared memory buffer, usable from several processes at once.
+Every entry is two 64-bit words: the packed data (move, score, depth, bound, age) and the
+Zobrist key XORed with that data. Processes read and write without locks; an entry torn
+by a concurrent write no longer XORs back to its key and simply reads as a miss.
+Entries sit in buckets of two slots: a depth-preferred slot that keeps the deepest (or
+newest) result, and an always-replace slot that takes everything else. The size is fixed
+in megabytes when the table is created, so memory never grows during long analysis runs.
+"""
+
+from multiprocessing import shared_memory
+
+BUCKET_BYTES = 32 # Two slots of two 64-bit words
+_HEADER_WORDS = 2 # Search age and bucket count
+
+# Packed data, low bit first: move (16 bits), score + _SCORE_OFFSET (18), depth (8), bound (2), age (8)
+_SCORE_SHIFT = 16
+_DEPTH_SHIFT = 34
+_BOUND_SHIFT = 42
+_AGE_SHIFT = 44
+_SCORE_OFFSET = 1 << 17 # Keeps scores (within +-CHECKMATE) positive
+_SCORE_MASK = (1 << 18) - 1
+
+
+class SharedTranspositionTable:
+    """
+    Same probe/store/newSearch/clear interface as ChessAI.TranspositionTable.
+    The creating process owns the buffer (newSearch, clear and close with unlink);
+    other processes attach by name, which is what unpickling the table does, so it can
+    be handed straight to a process pool initializer.
+    """
+    def __init__(self, megabytes=16, name=None):
+        if name is None:
+            buckets = 1 << max(1, (max(1, megabytes) * 1024 * 1024 // BUCKET_BYTES).bit_length() - 1)
+            self._memory = shared_memory.SharedMemory(create=True, size=(_HEADER_WORDS + 4 * buckets) * 8)
+            self.owner = True
+            self.words = self._memory.buf.cast('Q')
+            self.words[1] = buckets
+        else:
+            self._memory = shared_memory.SharedMemory(name=name)
+            self.owner = False
+            self.words = self._memory.buf.cast('Q')
+            buckets = self.words[1]
+        self.name = self._memory.name
+        self.buckets = buckets
+        self.mask = buckets - 1
+
+    def __reduce__(self):
+        return SharedTranspositionTable, (0, self.name)
+
+    @property
+    def megabytes(self):
+        return self.buckets * BUCKET_BYTES / (1024 * 1024)
+
+    @property
+    def age(self):
+        return self.words[0]
+
+    def newSearch(self):
+        """
+        Starts a new search: older entries lose their slot to any new result. Only the
+        owner ages the table, so helper processes searching the same position agree.
+        """
+        if self.owner:
+            self.words[0] = (self.words[0] + 1) & 0xFF
+
+    def clear(self):
+        """
+        Empties every bucket. The header stays, so processes attaching meanwhile still read the size.
+        """
+        if self.owner:
+            self._memory.buf[_HEADER_WORDS * 8:] = bytes(len(self._memory.buf) - _HEADER_WORDS * 8)
+
+    def close(self):
+        """
+        Detaches from the buffer; the owner also frees it, so close attached copies first.
+        """
+        if self.words is None:
+            return
+        self.words.release()
+        self.words = None
+        self._memory.close()
+        if self.owner:
+            self._memory.unlink()
+
+    def probe(self, key):
+        """
+        Returns (depth, bound, score, move) for key, or None.
+        """
+        words = self.words
+        base = _HEADER_WORDS + ((key & self.mask) << 2)
+        data = words[base + 1]
+        if not data or words[base] ^ data != key:
+            data = words[base + 3]
+            if not data or words[base + 2] ^ data != key:
+                return None
+        return ((data >> _DEPTH_SHIFT) & 0xFF, (data >> _BOUND_SHIFT) & 3,
+                ((data >> _SCORE_SHIFT) & _SCORE_MASK) - _SCORE_OFFSET, data & 0xFFFF)
+
+    def store(self, key, depth, bound, score, move):
+        words = self.words
+        age = words[0]
+        base = _HEADER_WORDS + ((key & self.mask) << 2)
+        data = words[base + 1]
+        sameKey = words[base] ^ data == key
+        if not data or sameKey or (data >> _AGE_SHIFT) != age or depth >= (data >> _DEPTH_SHIFT) & 0xFF:
+            slot = base
+        else:
+            slot = base + 2 # The deeper entry stays; this one goes to the always-replace slot
+            data = words[slot + 1]
+            sameKey = words[slot] ^ data == key
+        if move == 0 and sameKey and data:
+            move = data & 0xFFFF # Keep the known best move when a fail-low result has none
+        data = (move | (score + _SCORE_OFFSET) << _SCORE_SHIFT | min(max(depth, 0), 255) << _DEPTH_SHIFT |
+                bound << _BOUND_SHIFT | age << _AGE_SHIFT)
+        words[slot + 1] = data
+        words[slot] = key ^ data
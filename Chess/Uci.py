@@ -0,0 +1,249 @@
+"""
+Headless UCI (Universal Chess Interface) front end for the search in ChessAI.
+Lets tournament managers and GUIs (cutechess, Arena, ...) drive the engine over stdin/stdout,
+with no pygame window needed.
+
+Usage:
+    python -m Chess.Uci
+
+Supported commands: uci, isready, ucinewgame, setoption name Hash|Threads value <N>,
+position [startpos | fen <FEN>] [moves ...], go [depth N] [movetime ms] [nodes N]
+[wtime ms] [btime ms] [winc ms] [binc ms] [movestogo N] [infinite], stop, quit.
+The search runs on a worker thread so stop and isready are answered immediately.
+"""
+
+import os
+import sys
+import threading
+
+# Allow running as a script as well as with -m
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Chess.ChessEngine import GameState, moveCodeToUci
+from Chess.ChessAI import CHECKMATE, MATE_THRESHOLD, MAX_DEPTH
+from Chess.ParallelSearch import ParallelSearcher
+
+ENGINE_NAME = "Retro Chess"
+ENGINE_AUTHOR = "Saqib Masoodi"
+DEFAULT_MOVES_TO_GO = 30 # Assumed moves left in the game when the GUI doesn't say
+MOVE_OVERHEAD = 0.05 # Seconds kept back per move for I/O latency
+MAX_THREADS = 256
+DEFAULT_HASH_MB = 32 # Shared transposition table size (rounded down to a power of two)
+MAX_HASH_MB = 4096
+
+
+class UciEngine:
+    """
+    Reads UCI commands line by line and answers on the output stream.
+    """
+    def __init__(self, out=sys.stdout):
+        self.out = out
+        self.outputLock = threading.Lock()
+        self.threads = 1
+        self.hashMegabytes = DEFAULT_HASH_MB
+        self.searcher = ParallelSearcher(self.threads, self.hashMegabytes)
+        self.gs = GameState()
+        self.searchThread = None
+
+    def send(self, line):
+        with self.outputLock:
+            self.out.write(line + "\n")
+            self.out.flush()
+
+    def run(self, inp=sys.stdin):
+        for line in inp:
+            if not self.handle(line):
+                break
+        self.stopSearch()
+        self.searcher.close()
+
+    def handle(self, line):
+        """
+        Processes one command. Returns False when the engine should quit.
+        """
+        tokens = line.split()
+        if not tokens:
+            return True
+        command = tokens[0]
+        if command == "uci":
+            self.send(f"id name {ENGINE_NAME}")
+            self.send(f"id author {ENGINE_AUTHOR}")
+            self.send(f"option name Hash type spin default {DEFAULT_HASH_MB} min 1 max {MAX_HASH_MB}")
+            self.send(f"option name Threads type spin default 1 min 1 max {MAX_THREADS}")
+            self.send("uciok")
+        elif command == "isready":
+            self.send("readyok")
+        elif command == "ucinewgame":
+            self.stopSearch()
+            self.searcher.clear()
+            self.gs = GameState()
+        elif command == "setoption":
+            self.setOption(tokens[1:])
+        elif command == "position":
+            self.stopSearch()
+            self.setPosition(tokens[1:])
+        elif command == "go":
+            self.stopSearch()
+            self.startSearch(tokens[1:])
+        elif command == "stop":
+            self.stopSearch()
+        elif command == "quit":
+            return False
+        else:
+            self.send(f"info string unknown command {command}")
+        return True
+
+    def setOption(self, tokens):
+        # setoption name <id> value <x>
+        if "name" not in tokens or "value" not in tokens:
+            return
+        name = " ".join(tokens[tokens.index("name") + 1:tokens.index("value")]).lower()
+        value = " ".join(tokens[tokens.index("value") + 1:])
+        if name not in ("hash", "threads"):
+            return
+        try:
+            number = int(value)
+        except ValueError:
+            self.send(f"info string invalid value {value}")
+            return
+        self.stopSearch()
+        if name == "hash":
+            self.hashMegabytes = min(max(1, number), MAX_HASH_MB)
+        else:
+            self.threads = min(max(1, number), MAX_THREADS)
+        self.searcher.close()
+        self.searcher = ParallelSearcher(self.threads, self.hashMegabytes)
+
+    def setPosition(self, tokens):
+        if not tokens:
+            return
+        if tokens[0] == "startpos":
+            gs = GameState()
+            rest = tokens[1:]
+        elif tokens[0] == "fen":
+            end = tokens.index("moves") if "moves" in tokens else len(tokens)
+            try:
+                gs = GameState.from_fen(" ".join(tokens[1:end]))
+            except ValueError:
+                self.send("info string invalid fen")
+                return
+            rest = tokens[end:]
+        else:
+            return
+        if rest and rest[0] == "moves":
+            for uci in rest[1:]:
+                code = findMoveCode(gs, uci)
+                if code is None:
+                    self.send(f"info string illegal move {uci}")
+                    break
+                gs.makeMoveCode(code)
+        self.gs = gs
+
+    def startSearch(self, tokens):
+        options = _parseGoOptions(tokens)
+        depth = options.get("depth", MAX_DEPTH)
+        nodeLimit = options.get("nodes")
+        timeLimit = None
+        if "movetime" in options:
+            timeLimit = max(0.01, options["movetime"] / 1000 - MOVE_OVERHEAD)
+        elif not options.get("infinite"):
+            timeLimit = self.allocateTime(options)
+
+        # "position" always builds a new GameState after stopping the search, so the worker owns this one
+        self.searcher.stopEvent.clear() # Before the thread starts, so an early stop still counts
+        self.searchThread = threading.Thread(target=self._search, daemon=True,
+                                             args=(self.gs, depth, timeLimit, nodeLimit, bool(options.get("infinite"))))
+        self.searchThread.start()
+
+    def allocateTime(self, options):
+        """
+        Seconds to spend on this move from the clock, or None if the GUI gave no clock.
+        """
+        remaining = options.get("wtime" if self.gs.whiteToMove else "btime")
+        if remaining is None:
+            return None
+        increment = options.get("winc" if self.gs.whiteToMove else "binc", 0)
+        movesToGo = options.get("movestogo", DEFAULT_MOVES_TO_GO)
+        budget = remaining / max(1, movesToGo) + increment * 0.8
+        budget = min(budget, remaining * 0.5) # Never risk more than half the clock
+        return max(0.01, budget / 1000 - MOVE_OVERHEAD)
+
+    def _search(self, gs, depth, timeLimit, nodeLimit, infinite):
+        """
+        Worker thread: searches gs and always answers with a bestmove, even if the search fails.
+        """
+        bestMove = "0000" # No legal moves (checkmate or stalemate), or the search failed
+        try:
+            result = self.searcher.search(gs, maxDepth=depth, timeLimit=timeLimit, nodeLimit=nodeLimit,
+                                          onIteration=self.sendInfo)
+            if result is not None:
+                bestMove = moveCodeToUci(result.bestMove)
+        except Exception as e:
+            self.send(f"info string search failed: {e!r}")
+        finally:
+            if infinite:
+                # UCI: an infinite search that ends early (mate found, depth limit) still waits for stop
+                self.searcher.stopEvent.wait()
+            self.send(f"bestmove {bestMove}")
+
+    def sendInfo(self, result):
+        elapsedMs = int(result.elapsed * 1000)
+        nps = int(result.nodes / result.elapsed) if result.elapsed > 0 else 0
+        self.send(f"info depth {result.depth} score {formatScore(result.score)} nodes {result.nodes} "
+                  f"nps {nps} time {elapsedMs} pv {result.getPvNotation()}")
+
+    def stopSearch(self):
+        """
+        Stops a running search and waits for it to print its bestmove.
+        """
+        if self.searchThread is not None:
+            self.searcher.stop()
+            self.searchThread.join()
+            self.searchThread = None
+
+
+def findMoveCode(gs, uci):
+    """
+    Returns the packed legal move matching a UCI move string (e.g. e2e4, e7e8q), or None.
+    """
+    uci = uci.lower()
+    for code in gs.generateLegalMoves():
+        if moveCodeToUci(code) == uci:
+            return code
+    return None
+
+
+def formatScore(score):
+    """
+    UCI score field: "cp <centipawns>" or "mate <moves>" (negative when being mated).
+    """
+    if score >= MATE_THRESHOLD:
+        return f"mate {(CHECKMATE - score + 1) // 2}"
+    if score <= -MATE_THRESHOLD:
+        return f"mate {-((CHECKMATE + score) // 2)}" # "mate 0" when already mated
+    return f"cp {score}"
+
+
+def _parseGoOptions(tokens):
+    options = {}
+    i = 0
+    while i < len(tokens):
+        name = tokens[i]
+        if name == "infinite":
+            options["infinite"] = True
+        elif name in ("depth", "movetime", "nodes", "wtime", "btime", "winc", "binc", "movestogo") and i + 1 < len(tokens):
+            try:
+                options[name] = int(tokens[i + 1])
+            except ValueError:
+                pass
+            i += 1
+        i += 1
+    return options
+
+
+def main():
+    UciEngine().run()
+
+
+if __name__ == "__main__":
+    main()
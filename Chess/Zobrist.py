@@ -0,0 +1,24 @@
+"""
+Zobrist keys for hashing positions into a single 64-bit int.
+A position's key is the XOR of one random number per (piece, square), plus one each for
+the side to move, the castling rights and the en passant file, so GameState can update
+it incrementally as pieces move instead of re-reading the whole board.
+"""
+
+import random
+
+from Chess.Bitboard import PIECES
+
+_rng = random.Random(0x5EED_C4E55) # Fixed seed: keys (and therefore hashes) are stable between runs
+
+PIECE_KEYS = {piece: [_rng.getrandbits(64) for _ in range(64)] for piece in PIECES}
+BLACK_TO_MOVE_KEY = _rng.getrandbits(64)
+CASTLING_KEYS = [_rng.getrandbits(64) for _ in range(16)] # Indexed by castlingIndex()
+EN_PASSANT_KEYS = [_rng.getrandbits(64) for _ in range(8)] # Indexed by file (column)
+
+
+def castlingIndex(rights):
+    """
+    Packs a CastleRights object into 4 bits: wks, bks, wqs, bqs.
+    """
+    return rights.wks | rights.bks << 1 | rights.wqs << 2 | rights.bqs << 3